@@ -6,22 +6,27 @@ import logging
 import re
 import subprocess
 import sys
+from collections import deque
 from contextlib import suppress
 from datetime import datetime, timedelta
 from functools import lru_cache
-from time import sleep
-from typing import Any
+from time import perf_counter, sleep
+from typing import Any, ClassVar
 
 import pandas as pd
-from bs4 import BeautifulSoup
+import requests
 from pandas import to_datetime
-from selenium.common.exceptions import NoSuchWindowException, WebDriverException
+from selenium.common.exceptions import (
+    NoSuchWindowException,
+    TimeoutException,
+    WebDriverException,
+)
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.support.ui import WebDriverWait
 
 from src.config import genres, overwrite_label, silent_search
-from src.models import BeatportTrack
+from src.models import BeatportTrack, validate_tracks
 from src.spotify_utils import find_playlist_chart_label, update_hist_pl_tracks
 from src.utils import load_hist_file
 
@@ -34,11 +39,32 @@ logging.getLogger("urllib3").setLevel(logging.ERROR)
 
 logger = logging.getLogger("beatport")
 
-SLEEP_LOAD_PAGE = 20
+HTTP_TIMEOUT = 10
+NEXT_DATA_PATTERN = re.compile(
+    r'<script id="__NEXT_DATA__" type="application/json"[^>]*>(.*?)</script>',
+    re.DOTALL,
+)
+# Markers of the Cloudflare challenge page served instead of the Beatport page
+CLOUDFLARE_MARKERS = ("challenge-platform", "cf-chl", "Just a moment...")
+# Predicates evaluated in the browser until the page data is rendered
+NEXT_DATA_READY_SCRIPT = (
+    "const script = document.getElementById('__NEXT_DATA__');"
+    "return script !== null && script.textContent.includes('dehydratedState');"
+)
+NEXT_DATA_TEXT_SCRIPT = "return document.getElementById('__NEXT_DATA__')?.textContent;"
+# Chart links, or the page data for pages without charts
+CHARTS_READY_SCRIPT = (
+    "const script = document.getElementById('__NEXT_DATA__');"
+    "return document.querySelector('a[href*=\"/chart/\"]') !== null"
+    " || (script !== null && script.textContent.includes('dehydratedState'));"
+)
 
 
 def _accept_cookies(driver: Any) -> None:
-    """Attempt to accept cookies if a banner is present."""
+    """Attempt to accept cookies if a banner is present, once per browser."""
+    if BeatportBrowser.cookies_checked:
+        return
+    BeatportBrowser.cookies_checked = True
     try:
         # Check if window still exists
         if not driver.window_handles:
@@ -70,6 +96,7 @@ class BeatportBrowser:
     """Manages a persistent browser instance for Beatport scraping."""
 
     _driver: Any = None
+    cookies_checked: ClassVar[bool] = False
 
     @classmethod
     def get_driver(cls) -> Any:
@@ -93,6 +120,7 @@ class BeatportBrowser:
                 with suppress(Exception):
                     cls._driver.quit()
             cls._driver = _get_driver()
+            cls.cookies_checked = False
 
         return cls._driver
 
@@ -103,6 +131,129 @@ class BeatportBrowser:
             with suppress(Exception):
                 cls._driver.quit()
             cls._driver = None
+            cls.cookies_checked = False
+
+
+class PageLoadTimer:
+    """Latencies of the browser page loads, adapting the wait timeout to them.
+
+    Pages are waited for until their data is rendered, for at most a few times
+    the slowest recent load, and `max_timeout` on retries.
+    """
+
+    min_timeout: ClassVar[float] = 10
+    max_timeout: ClassVar[float] = 60
+    timeout_factor: ClassVar[float] = 3
+    _latencies: ClassVar[deque[float]] = deque(maxlen=20)
+    n_pages: ClassVar[int] = 0
+    total_latency: ClassVar[float] = 0
+
+    @classmethod
+    def timeout(cls, retry: bool = False) -> float:
+        """Get the timeout of the next page load."""
+        if retry or not cls._latencies:
+            return cls.max_timeout
+        return min(
+            max(cls.timeout_factor * max(cls._latencies), cls.min_timeout),
+            cls.max_timeout,
+        )
+
+    @classmethod
+    def record(cls, url: str, latency: float) -> None:
+        """Record the time taken by a page to be ready."""
+        cls._latencies.append(latency)
+        cls.n_pages += 1
+        cls.total_latency += latency
+        logger.info(f"Page ready in {latency:.1f}s: {url}")
+
+    @classmethod
+    def log_stats(cls) -> None:
+        """Log the mean page load latency for the run."""
+        if cls.n_pages:
+            logger.info(
+                f"[+] Browser pages: {cls.n_pages:,} loaded, "
+                f"ready in {cls.total_latency / cls.n_pages:.1f}s on average"
+            )
+
+
+class BeatportSession:
+    """HTTP session fetching Beatport pages without the browser.
+
+    Beatport pages embed their data in the Next.js __NEXT_DATA__ script, served
+    with the HTML. The session reuses the cookies and user agent of the
+    BeatportBrowser, which passes the Cloudflare challenges. Once a challenge is
+    served, pages are loaded with the browser until its cookies are synced again.
+    """
+
+    _session: ClassVar[requests.Session | None] = None
+    is_challenged: ClassVar[bool] = False
+
+    @classmethod
+    def get_session(cls) -> requests.Session:
+        """Get or create the pooled HTTP session."""
+        if cls._session is None:
+            cls._session = requests.Session()
+            cls._session.headers.update(
+                {**HEADERS, "accept": "text/html,application/xhtml+xml"}
+            )
+        return cls._session
+
+    @classmethod
+    def sync_from_browser(cls, driver: Any) -> None:
+        """Copy the cookies and user agent of the browser to the session."""
+        session = cls.get_session()
+        try:
+            session.headers["User-Agent"] = driver.execute_script(
+                "return navigator.userAgent"
+            )
+            for cookie in driver.get_cookies():
+                session.cookies.set(
+                    cookie["name"],
+                    cookie["value"],
+                    domain=cookie.get("domain", ""),
+                    path=cookie.get("path", "/"),
+                )
+        except Exception as e:
+            logger.debug(f"Failed to sync browser cookies: {e}")
+            return
+        cls.is_challenged = False
+
+    @classmethod
+    def fetch_next_data(cls, url: str) -> dict | None:
+        """Fetch the __NEXT_DATA__ JSON of a Beatport page over HTTP.
+
+        Args:
+            url: URL of the page.
+
+        Returns:
+            The page data, None if Cloudflare served a challenge or the page could
+            not be fetched.
+
+        """
+        if cls.is_challenged:
+            return None
+        start = perf_counter()
+        try:
+            response = cls.get_session().get(url, timeout=HTTP_TIMEOUT)
+        except Exception as e:
+            logger.debug(f"HTTP fetch failed for {url}: {e}")
+            return None
+
+        match = NEXT_DATA_PATTERN.search(response.text)
+        if response.status_code == 200 and match:
+            try:
+                next_data = json.loads(match.group(1))
+            except ValueError as e:
+                logger.debug(f"Invalid __NEXT_DATA__ fetched over HTTP for {url}: {e}")
+                return None
+            logger.debug(f"Fetched {url} over HTTP in {perf_counter() - start:.2f}s")
+            return next_data
+        if response.status_code in (403, 503) or any(
+            marker in response.text for marker in CLOUDFLARE_MARKERS
+        ):
+            logger.info(f"Cloudflare challenge on {url}, loading pages with the browser")
+            cls.is_challenged = True
+        return None
 
 
 def _get_chrome_major_version() -> int | None:
@@ -221,42 +372,35 @@ def _get_driver(max_retries: int = 3) -> Any:
             sleep(5)
 
 
-def _wait_for_dehydrated_state(driver: Any, url: str) -> str:
-    """Wait for dehydratedState to appear in page source and return it."""
-    page_source = ""
-    for i in range(60):
-        try:
-            # Check if window still exists before accessing
-            if not driver.window_handles:
-                raise ValueError("Browser window closed unexpectedly")
+def _wait_until_ready(driver: Any, ready_script: str, timeout: float) -> bool:
+    """Wait until the ready_script predicate is true in the page.
 
-            page_source = driver.page_source
-            if "dehydratedState" in page_source:
-                break
+    Args:
+        driver: Browser driver, with the page loading.
+        ready_script: JavaScript returning whether the page is ready.
+        timeout: Maximum number of seconds to wait.
 
-            if i % 10 == 0:
-                logger.debug(
-                    f"Still waiting for dehydratedState on {url} (attempt {i}/60)..."
-                )
-        except (NoSuchWindowException, WebDriverException) as e:
-            logger.warning(f"Browser window lost during wait: {e}")
-            raise
-        except Exception as e:
-            logger.debug(f"Transient error getting page source: {e}")
-        sleep(1)
+    Returns:
+        Whether the page got ready before the timeout.
 
-    if not page_source or "dehydratedState" not in page_source:
-        try:
-            logger.warning(f"Failed to find dehydratedState. Page title: {driver.title}")
-        except Exception:
-            pass
-        raise ValueError(f"Failed to find dehydratedState in {url}")
-    return page_source
+    """
+    if not driver.window_handles:
+        raise ValueError("Browser window closed unexpectedly")
+    try:
+        WebDriverWait(driver, timeout, poll_frequency=0.25).until(
+            lambda d: d.execute_script(ready_script)
+        )
+    except TimeoutException:
+        return False
+    return True
 
 
 @lru_cache(maxsize=16)
 def get_beatport_page_script_queries(url: str) -> dict:
-    """Extract script queries results from the Beatport URL using undetected-chromedriver.
+    """Extract script queries results from the Beatport URL.
+
+    The page is fetched over HTTP, with undetected-chromedriver as a fallback when
+    Cloudflare serves a challenge.
 
     Args:
         url: URL to query.
@@ -265,6 +409,13 @@ def get_beatport_page_script_queries(url: str) -> dict:
         JSON of the script queries.
 
     """
+    next_data = BeatportSession.fetch_next_data(url)
+    if next_data is not None:
+        try:
+            return next_data["props"]["pageProps"]["dehydratedState"]["queries"]
+        except (KeyError, TypeError):
+            logger.debug(f"No dehydratedState fetched over HTTP for {url}")
+
     max_load_retries = 3
     last_error = None
 
@@ -275,30 +426,37 @@ def get_beatport_page_script_queries(url: str) -> dict:
             )
             driver = BeatportBrowser.get_driver()
             logger.debug(f"Using persistent driver for {url}. Getting URL...")
+            start = perf_counter()
             driver.get(url)
-            logger.debug(f"URL loaded for {url}. Sleeping {SLEEP_LOAD_PAGE}s...")
-            sleep(SLEEP_LOAD_PAGE)  # Wait for page to load
+            logger.debug(f"Waiting for dehydratedState on {url}...")
+            if not _wait_until_ready(
+                driver, NEXT_DATA_READY_SCRIPT, PageLoadTimer.timeout(retry=attempt > 0)
+            ):
+                with suppress(Exception):
+                    logger.warning(
+                        f"Failed to find dehydratedState. Page title: {driver.title}"
+                    )
+                raise ValueError(f"Failed to find dehydratedState in {url}")
+            PageLoadTimer.record(url, perf_counter() - start)
             _accept_cookies(driver)
 
-            logger.debug(f"Waiting for dehydratedState on {url}...")
-            page_source = _wait_for_dehydrated_state(driver, url)
-            logger.debug(f"dehydratedState found on {url}.")
-
-            soup = BeautifulSoup(page_source, features="html.parser")
-            all_scripts = soup.find_all("script", type="application/json")
-            script = None
-            for s in all_scripts:
-                if "dehydratedState" in s.text:
-                    script = s
-                    break
-
-            if script is None:
+            # Only read the page data JSON, rather than the whole page source
+            read_start = perf_counter()
+            next_data_text = driver.execute_script(NEXT_DATA_TEXT_SCRIPT)
+            if not next_data_text:
                 raise ValueError(f"Could not find script with dehydratedState in {url}")
-
-            results_data = json.loads(script.text)
+            parse_start = perf_counter()
+            results_data = json.loads(next_data_text)
+            logger.debug(
+                f"Read {len(next_data_text.encode()):,} bytes of page data in "
+                f"{(parse_start - read_start) * 1e3:.0f} ms, parsed in "
+                f"{(perf_counter() - parse_start) * 1e3:.0f} ms: {url}"
+            )
             results_data_queries = results_data["props"]["pageProps"]["dehydratedState"][
                 "queries"
             ]
+            # The browser passed the Cloudflare challenge, try HTTP again next time
+            BeatportSession.sync_from_browser(driver)
 
             return results_data_queries
 
@@ -320,26 +478,6 @@ def get_beatport_page_script_queries(url: str) -> dict:
     )
 
 
-def _wait_for_charts(driver: Any, max_wait: int) -> None:
-    """Wait for chart links or dehydratedState to appear."""
-    for _ in range(max_wait):
-        try:
-            if not driver.window_handles:
-                raise ValueError("Browser window closed unexpectedly")
-
-            if (
-                driver.find_elements(By.CSS_SELECTOR, 'a[href*="/chart/"]')
-                or "dehydratedState" in driver.page_source
-            ):
-                break
-        except (NoSuchWindowException, WebDriverException) as e:
-            logger.warning(f"Browser window lost during charts wait: {e}")
-            raise
-        except Exception as e:
-            logger.debug(f"Transient error in scrape_beatport_charts wait: {e}")
-        sleep(1)
-
-
 def _extract_links(driver: Any) -> list:
     """Extract chart links from the page."""
     try:
@@ -362,7 +500,7 @@ def scrape_beatport_charts(
     Args:
         url (str): The Beatport artist page URL to scrape for charts.
         max_wait (int, optional): Maximum number of seconds to wait for
-        the page to load.
+        the chart links to appear.
         chart_bp_url_code (str, optional): If provided, only chart links
         containing this code will be returned.
 
@@ -379,11 +517,15 @@ def scrape_beatport_charts(
         try:
             driver = BeatportBrowser.get_driver()
             logger.info(f"Loading URL: {url}")
+            timeout = min(max_wait, PageLoadTimer.timeout(retry=attempt > 0))
+            start = perf_counter()
             driver.get(url)
-            sleep(SLEEP_LOAD_PAGE)  # Wait for page to load
+            if _wait_until_ready(driver, CHARTS_READY_SCRIPT, timeout):
+                PageLoadTimer.record(url, perf_counter() - start)
+            else:
+                logger.debug(f"Charts page {url} not ready after {timeout:.0f}s")
             _accept_cookies(driver)
 
-            _wait_for_charts(driver, max_wait)
             links = _extract_links(driver)
 
             for link in links:
@@ -451,38 +593,37 @@ def parse_tracks(raw_tracks_dicts: list[dict]) -> list:
         List of tracks.
 
     """
-    tracks = list()
+    tracks_data = list()
     for track in raw_tracks_dicts:
         try:
-            tracks.append(
-                BeatportTrack.model_validate(
-                    {
-                        # "title": track["title"],
-                        "name": track["name"],
-                        "mix": track["mix_name"],
-                        "artists": [artist["name"] for artist in track["artists"]],
-                        "remixers": [remixer["name"] for remixer in track["remixers"]],
-                        "release": track["release"]["name"],
-                        "label": track["release"]["label"]["name"],
-                        "published_date": track["publish_date"],
-                        # "released_date": track["date"]["released"],
-                        "duration": track[
-                            "length"
-                        ],  # TODO was ["duration"]["minutes"] before,
-                        # to check if the same
-                        "duration_ms": track["length_ms"],
-                        "genres": track["genre"][
-                            "name"
-                        ],  # Used to be track["genres"] as list
-                        "bpm": track["bpm"],
-                        "key": track["key"][
-                            "name"
-                        ],  # Was only track["key"] before, but dict
-                    }
-                )
+            tracks_data.append(
+                {
+                    # "title": track["title"],
+                    "name": track["name"],
+                    "mix": track["mix_name"],
+                    "artists": [artist["name"] for artist in track["artists"]],
+                    "remixers": [remixer["name"] for remixer in track["remixers"]],
+                    "release": track["release"]["name"],
+                    "label": track["release"]["label"]["name"],
+                    "published_date": track["publish_date"],
+                    # "released_date": track["date"]["released"],
+                    "duration": track[
+                        "length"
+                    ],  # TODO was ["duration"]["minutes"] before,
+                    # to check if the same
+                    "duration_ms": track["length_ms"],
+                    "isrc": track.get("isrc"),
+                    "genre": track["genre"]["name"],  # Used to be track["genres"] as list
+                    "bpm": track["bpm"],
+                    "key": track["key"]["name"],  # Was only track["key"] before, but dict
+                }
             )
         except Exception as e:
             logger.warning(f"Failed to parse track {track}: {e}")
+
+    tracks, invalid_tracks = validate_tracks(tracks_data)
+    for track_data, error in invalid_tracks:
+        logger.warning(f"Failed to parse track {track_data}: {error}")
     return tracks
 
 
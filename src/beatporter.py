@@ -7,6 +7,7 @@ import queue
 import random
 import sys
 import threading
+from collections import Counter
 from datetime import datetime
 from time import sleep
 
@@ -14,6 +15,7 @@ import pandas as pd
 
 from src.beatport import (
     BeatportBrowser,
+    PageLoadTimer,
     find_chart,
     get_chart,
     get_label_tracks,
@@ -32,15 +34,21 @@ from src.config import (
 )
 from src.gcp import download_file_to_gcs, upload_file_to_gcs
 from src.spotify_search import (
+    ResolutionTable,
+    SpeculativeSearch,
+    StrategyStats,
     add_new_tracks_to_playlist_chart_label,
     add_new_tracks_to_playlist_genre,
 )
 from src.spotify_utils import (
+    SearchMemo,
     back_up_spotify_playlist,
     dedup_playlists,
+    flush_playlist_descriptions,
     get_all_playlists,
     update_hist_pl_tracks,
 )
+from src.track_index import TrackIndex
 from src.utils import FILE_NAME_HIST, PATH_HIST_LOCAL, deduplicate_hist_file
 
 logger = logging.getLogger("beatporter")
@@ -169,7 +177,15 @@ def _sync_result(result: dict) -> None:
             logger.info(f"Syncing label : ***** {name} *****")
             if result["shuffle"]:
                 random.shuffle(tracks)
-            add_new_tracks_to_playlist_chart_label(name, tracks, uri=result["code"])
+            # The playlist name is arbitrary, the label name is the one on Beatport
+            label = (
+                Counter(track.label for track in tracks).most_common(1)[0][0]
+                if tracks
+                else None
+            )
+            add_new_tracks_to_playlist_chart_label(
+                name, tracks, uri=result["code"], label=label
+            )
 
     except Exception as e:
         logger.error(f"[Sync] FAILED syncing {res_type} {name} to Spotify: {e}")
@@ -279,6 +295,14 @@ def main(
             result_queue.task_done()
 
     # Output
+    flush_playlist_descriptions()
+    SearchMemo.log_stats()
+    ResolutionTable.log_stats()
+    StrategyStats.log_stats()
+    SpeculativeSearch.log_stats()
+    PageLoadTimer.log_stats()
+    StrategyStats.save()
+    TrackIndex.save()
     sleep(5)
     deduplicate_hist_file()
     if use_gcp:
@@ -62,6 +62,26 @@ silent_search = True
 # If set to true will remove feat artist2 and original mix to improve the search
 parse_track = True
 
+# Search strategy
+#   "v2" to send narrow queries (track, artist, album) until one matches
+#   "wide" to send one or two broad queries with up to 50 results each and score
+#   the candidates locally, falling back to "v2" when no candidate is close enough
+search_strategy = "v2"
+
+# Duration tolerance
+# Spotify tracks lasting within this many milliseconds of the Beatport track are
+# considered the same version, others are only matched with a lower score
+duration_tolerance_ms = 2000
+
+# Speculative searches
+# Number of queries of a track search plan sent concurrently, the first one to
+# match in plan order is kept and the other searches are wasted. 1 to send the
+# queries one at a time
+speculative_queries = 1
+
+# Maximum number of Spotify searches per second, shared by concurrent searches
+spotify_searches_per_second = 10
+
 # Playlist prefix
 playlist_prefix = "Beatport: "
 
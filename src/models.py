@@ -1,10 +1,26 @@
 """Data models."""
 
-from pydantic import BaseModel
+from collections.abc import Iterable
+from functools import cached_property
+from typing import Any, ClassVar, Self
+
+from pydantic import BaseModel, TypeAdapter, ValidationError
+
+from src.search_utils import (
+    CachedIterable,
+    NameVariant,
+    artist_variants,
+    clean_track_name,
+    parse_track_regex_beatport,
+)
 
 
 class BeatportTrack(BaseModel):
-    """Represent a track with its associated details."""
+    """Represent a track with its associated details.
+
+    Normalized forms of the name and artists used by the searches are computed
+    on first access and cached, until the name, mix or artists change.
+    """
 
     title: str | None = ""
     name: str
@@ -17,4 +33,112 @@ class BeatportTrack(BaseModel):
     released_date: str = ""
     duration: str
     duration_ms: int
-    name_mix: str = ""
+    isrc: str | None = None
+    genre: str | None = None
+    bpm: int | None = None
+    key: str | None = None
+
+    _normalized_inputs: ClassVar[set[str]] = {"name", "mix", "artists", "duration_ms"}
+    _normalized_attributes: ClassVar[tuple[str, ...]] = (
+        "full_name",
+        "norm_name",
+        "norm_artists",
+        "artist_variants",
+        "name_variants",
+        "fingerprint",
+    )
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        """Set an attribute, dropping the normalized forms computed from it."""
+        super().__setattr__(name, value)
+        if name in self._normalized_inputs:
+            self._clear_normalized()
+
+    def _clear_normalized(self) -> None:
+        for attribute in self._normalized_attributes:
+            self.__dict__.pop(attribute, None)
+
+    def model_copy(
+        self, *, update: dict[str, Any] | None = None, deep: bool = False
+    ) -> Self:
+        """Copy the track, keeping the normalized forms if still valid."""
+        track_copy = super().model_copy(update=update, deep=deep)
+        if update and self._normalized_inputs.intersection(update):
+            track_copy._clear_normalized()
+        return track_copy
+
+    @cached_property
+    def full_name(self) -> str:
+        """Name and mix formatted as on Spotify, "Name - Mix"."""
+        return self.name + ("" if not self.mix else f" - {self.mix}")
+
+    @cached_property
+    def norm_name(self) -> str:
+        """Lowercase name without feat, edit and mix information."""
+        return clean_track_name(self.name).lower()
+
+    @cached_property
+    def norm_artists(self) -> tuple[str, ...]:
+        """Lowercase artist names."""
+        return tuple(artist.lower() for artist in self.artists)
+
+    @cached_property
+    def artist_variants(self) -> Iterable[tuple[str, str]]:
+        """Artists and their parsed variants, as (variant kind, artist name).
+
+        Variants are parsed lazily, as the searches iterate over them.
+        """
+        return CachedIterable(artist_variants(self.artists))
+
+    @cached_property
+    def name_variants(self) -> Iterable[NameVariant]:
+        """The track name and mix, then their parsed variants.
+
+        Variants are parsed lazily, as the searches iterate over them.
+        """
+        return CachedIterable(parse_track_regex_beatport(self))
+
+    @cached_property
+    def fingerprint(self) -> str:
+        """Key identifying the same track across charts, labels and genres."""
+        return "|".join(
+            [
+                ",".join(sorted(self.norm_artists)),
+                self.norm_name,
+                (self.mix or "").lower(),
+                str(self.duration_ms),
+            ]
+        )
+
+
+_tracks_adapter = TypeAdapter(list[BeatportTrack])
+
+
+def validate_tracks(
+    tracks_data: list[dict[str, Any]],
+) -> tuple[list[BeatportTrack], list[tuple[dict[str, Any], ValidationError]]]:
+    """Validate track dicts in a single pydantic pass.
+
+    Pages of label tracks are validated at once, which is faster than one
+    `model_validate` per track. If some tracks are invalid, the others are still
+    returned.
+
+    Args:
+        tracks_data (list): Track dicts.
+
+    Returns:
+        tuple: The valid tracks, and each invalid track dict with its error.
+    """
+    try:
+        return _tracks_adapter.validate_python(tracks_data), []
+    except ValidationError:
+        pass
+
+    tracks = []
+    invalid_tracks = []
+    for track_data in tracks_data:
+        try:
+            tracks.append(BeatportTrack.model_validate(track_data))
+        except ValidationError as e:
+            invalid_tracks.append((track_data, e))
+    return tracks, invalid_tracks
@@ -1,52 +1,225 @@
 """Search utils module."""
 
 import re
+from collections.abc import Callable, Iterable, Iterator
+from typing import TYPE_CHECKING, NamedTuple
 
+if TYPE_CHECKING:
+    from src.models import BeatportTrack
 
-def clean_track_name(track_name: str) -> str:
-    """Clean a track name by removing various unwanted parts.
-
-    Args:
-        track_name (str): The track name string.
 
-    Returns:
-        str: The cleaned track name string.
-
-    """
+# Rules of clean_track_name, applied in order: (keywords, pattern)
+# A rule is only run when one of its keywords is in the track name, the keywords
+# are matched on the name lowercased with TRIGGER_TRANSLATION, which maps the
+# non-ASCII letters that re.IGNORECASE matches with ASCII letters.
+CLEAN_TRACK_NAME_RULES = [
     # Remove feat info (including variations in casing and parentheses)
-    track_name = re.sub(
-        r"\s*-\s*?(?:Feat|feat|Ft|ft)\.\s+[\w\s&]+\)?",
-        "",
-        track_name,
-        flags=re.IGNORECASE,
-    )
+    (
+        ("feat.", "ft."),
+        re.compile(r"\s*-\s*?(?:Feat|feat|Ft|ft)\.\s+[\w\s&]+\)?", re.IGNORECASE),
+    ),
     # Remove feat info (including variations in casing and parentheses)
-    track_name = re.sub(
-        r"\s*\(?(?:Feat|feat|Ft|ft)\.\s+[\w\s&]+\)?", "", track_name, flags=re.IGNORECASE
-    )
+    (
+        ("feat.", "ft."),
+        re.compile(r"\s*\(?(?:Feat|feat|Ft|ft)\.\s+[\w\s&]+\)?", re.IGNORECASE),
+    ),
     # Remove feat info (after -)
-    track_name = re.sub(
-        r"\s*-\s*(?:Feat|feat|Ft|ft)\.\s+[\w\s&]+", "", track_name, flags=re.IGNORECASE
-    )
+    (
+        ("feat.", "ft."),
+        re.compile(r"\s*-\s*(?:Feat|feat|Ft|ft)\.\s+[\w\s&]+", re.IGNORECASE),
+    ),
     # Remove " - Radio Edit" (case-insensitive)
-    track_name = re.sub(r"\s*-\s*Radio Edit", "", track_name, flags=re.IGNORECASE)
+    (("radio edit",), re.compile(r"\s*-\s*Radio Edit", re.IGNORECASE)),
     # Remove "Radio Edit" (case-insensitive)
-    track_name = re.sub(r"\s*\(?Radio Edit\)?", "", track_name, flags=re.IGNORECASE)
+    (("radio edit",), re.compile(r"\s*\(?Radio Edit\)?", re.IGNORECASE)),
     # Remove " - Extended Mix" (case-insensitive)
-    track_name = re.sub(r"\s*-\s*Extended Mix", "", track_name, flags=re.IGNORECASE)
+    (("extended mix",), re.compile(r"\s*-\s*Extended Mix", re.IGNORECASE)),
     # Remove "(Extended Mix)" (case-insensitive)
-    track_name = re.sub(r"\s*\(?Extended Mix\)?", "", track_name, flags=re.IGNORECASE)
+    (("extended mix",), re.compile(r"\s*\(?Extended Mix\)?", re.IGNORECASE)),
     # Remove "- Original Mix" (case-insensitive)
-    track_name = re.sub(
-        r"\s*-?\s*[Oo]riginal [Mm]ix", "", track_name, flags=re.IGNORECASE
-    )
+    (("original mix",), re.compile(r"\s*-?\s*[Oo]riginal [Mm]ix", re.IGNORECASE)),
     # Remove "Extended Vox Mix" (case-insensitive)
-    track_name = re.sub(r"\s*\(?Extended Vox Mix\)?", "", track_name, flags=re.IGNORECASE)
+    (("extended vox mix",), re.compile(r"\s*\(?Extended Vox Mix\)?", re.IGNORECASE)),
     # Remove "- Extended" (case-insensitive)
-    track_name = re.sub(r"\s*-?\s*[Ee]xtended", "", track_name, flags=re.IGNORECASE)
-    # Remove double spaces
-    track_name = re.sub(r"\s+", " ", track_name)
-    # Remove leading/trailing spaces
-    track_name = track_name.strip()
+    (("extended",), re.compile(r"\s*-?\s*[Ee]xtended", re.IGNORECASE)),
+]
+TRIGGER_TRANSLATION = str.maketrans(
+    {"\u0130": "i", "\u0131": "i", "\u017f": "s", "\u212a": "k"}
+)
+
+
+def clean_track_name(track_name: str) -> str:
+    """Clean a track name by removing various unwanted parts.
+
+    Args:
+        track_name (str): The track name string.
+
+    Returns:
+        str: The cleaned track name string.
+
+    """
+    trigger_name = track_name.translate(TRIGGER_TRANSLATION).lower()
+    for keywords, pattern in CLEAN_TRACK_NAME_RULES:
+        if any(keyword in trigger_name for keyword in keywords):
+            cleaned_name = pattern.sub("", track_name)
+            if cleaned_name != track_name:
+                track_name = cleaned_name
+                trigger_name = track_name.translate(TRIGGER_TRANSLATION).lower()
+    # Remove double, leading and trailing spaces
+    return " ".join(track_name.split())
+
+
+FEAT_SUFFIX_PATTERN = re.compile(r"(\s*(Feat|feat|Ft|ft)\. [\w\s]*$)")
+NON_WORD_PATTERN = re.compile(r"\W")
+PUNCTUATION_PATTERN = re.compile(r"[^\w\s]")
+ORIGINAL_MIX_PATTERN = re.compile("[O|o]riginal [M|m]ix")
+REMIX_PATTERN = re.compile("[R|r]emix")
+MIX_PATTERN = re.compile("[M|m]ix")
+# Number of parse methods of _name_mix_variants
+N_NAME_METHODS = 8
+
+
+class NameVariant(NamedTuple):
+    """Parsed track name and mix, with the parse method that produced them."""
+
+    method: int
+    name: str
+    mix: str | None
+
+    @property
+    def name_mix(self) -> str:
+        """Name and mix formatted as on Spotify, "Name - Mix"."""
+        return self.name + ("" if not self.mix else f" - {self.mix}")
+
+
+class CachedIterable:
+    """Iterable over an iterator, computing each item once and on demand.
+
+    Iterations can be repeated and interleaved, they replay the items already
+    computed before pulling new ones from the iterator.
+    """
+
+    def __init__(self, iterable: Iterable) -> None:
+        """Wrap an iterable, without consuming it."""
+        self._iterator = iter(iterable)
+        self._items: list = []
+
+    def __iter__(self) -> Iterator:
+        """Iterate over the cached items, then over the rest of the iterator."""
+        i_item = 0
+        while True:
+            if i_item == len(self._items):
+                try:
+                    self._items.append(next(self._iterator))
+                except StopIteration:
+                    return
+            yield self._items[i_item]
+            i_item += 1
 
-    return track_name
+
+def _name_mix_variants(name: str, mix: str) -> Iterator[tuple[str, str | None]]:
+    # Method 0: the track as is
+    yield name, mix
+
+    # Remove feat info, mostly not present in spotify
+    name_no_feat = FEAT_SUFFIX_PATTERN.sub("", name)
+
+    # Method 1
+    # Remove special characters as they are not handled by Spotify API
+    yield NON_WORD_PATTERN.sub(" ", name_no_feat), mix
+
+    # Method 2
+    # Remove feat and mixes
+    # Remove original mix and extended mix as not used in Spotify
+    if ORIGINAL_MIX_PATTERN.search(mix) or mix == "Extended Mix":
+        yield name_no_feat, None
+    else:
+        yield name_no_feat, mix
+
+    # Remove special characters as they are not handled by Spotify API
+    name_no_punctuation = PUNCTUATION_PATTERN.sub("", name_no_feat)
+
+    # Method 3
+    yield name_no_punctuation, mix
+
+    # Method 4
+    # Change remix to mix and mix to remix
+    yield name_no_punctuation, MIX_PATTERN.sub("Remix", REMIX_PATTERN.sub("mix", mix))
+
+    # Method 5
+    # Remove mix
+    yield name_no_punctuation, MIX_PATTERN.sub("", mix)
+
+    # Methods 6 and 7
+    # Remove feat and replace mixes with edits, as often exists on Spotify only
+    yield name_no_feat, "Edit"
+    yield name_no_feat, "Radio-Edit"
+
+
+def parse_track_regex_beatport(track: "BeatportTrack") -> Iterator[NameVariant]:
+    """Parse track name and mix using regular expressions.
+
+    Variants are generated lazily, each regular expression only runs when the
+    previous variants have been consumed. Variants formatted as an already
+    generated one are skipped, their methods are missing from the variants.
+
+    Args:
+        track (BeatportTrack): Track to parse.
+
+    Yields:
+        NameVariant: The track name and mix, then their parsed variants.
+
+    """
+    seen_name_mixes = set()
+    for method, (name, mix) in enumerate(_name_mix_variants(track.name, track.mix)):
+        variant = NameVariant(method, name, mix)
+        if variant.name_mix not in seen_name_mixes:
+            seen_name_mixes.add(variant.name_mix)
+            yield variant
+
+
+def add_space(match: re.Match) -> str:
+    """Add a space before the matched string.
+
+    Args:
+        match (re.Match): The matched string.
+
+    Returns:
+        str: The modified string with a space added.
+
+    """
+    return " " + match.group()
+
+
+# Artist name variants searched when parsing: (kind, pattern, replacement)
+ArtistVariant = tuple[str, re.Pattern[str], str | Callable[[re.Match[str]], str]]
+ARTIST_VARIANTS: list[ArtistVariant] = [
+    ("no_brackets", re.compile(r"\s*\([^)]*\)"), ""),  # Remove (UK) for example
+    # Remove special characters, in case it is not handled by Spotify API
+    ("no_symbols", re.compile(r"\W+"), " "),
+    ("no_punctuation", re.compile(r"[^\w\s]"), ""),
+    # Splitting artist name with a space after a capital letter
+    ("split_capitals", re.compile(r"(?<=\w)[A-Z]"), add_space),
+    ("no_ampersand", re.compile(r"\s&.*$"), ""),  # Removing second part after &
+]
+
+
+def artist_variants(artists: list[str]) -> Iterator[tuple[str, str]]:
+    """Generate the artists to search with and the kind of parsing applied to each.
+
+    Args:
+        artists (list): Artist names.
+
+    Yields:
+        tuple: (variant kind, artist name), original artists first.
+    """
+    for artist_ in artists:
+        yield "original", artist_
+    # Add parsed artist if not in list already
+    seen_artists = set(artists)
+    for kind, pattern, replacement in ARTIST_VARIANTS:
+        for artist_ in artists:
+            parsed_artist = pattern.sub(replacement, artist_)
+            if parsed_artist not in seen_artists:
+                seen_artists.add(parsed_artist)
+                yield kind, parsed_artist
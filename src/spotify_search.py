@@ -1,190 +1,480 @@
 """Module to manage Spotify queries."""
 
 import gc
+import json
 import logging
-import re
+import os
+from collections import defaultdict
+from collections.abc import Callable, Iterable, Iterator
+from concurrent.futures import ThreadPoolExecutor
 from datetime import UTC, datetime
+from functools import partial
+from itertools import islice, takewhile
+from typing import ClassVar, NamedTuple
 
 import pandas as pd
 import spotipy
 from requests.exceptions import ReadTimeout
 
+from src import config
 from src.config import (
     daily_mode,
     daily_n_track,
     digging_mode,
+    folder_path,
     parse_track,
     playlist_prefix,
     silent_search,
 )
 from src.configure_logging import configure_logging
 from src.models import BeatportTrack
+from src.search_utils import N_NAME_METHODS, NameVariant
 from src.spotify_utils import (
-    add_space,
+    SearchMemo,
+    SingleFlight,
     add_tracks_to_playlist,
-    clear_playlist,
     create_playlist,
+    do_durations_match,
+    get_album_tracks,
+    get_label_catalog,
     get_playlist_id,
+    get_playlist_track_ids,
     get_track_detail,
     parse_search_results_spotify,
-    parse_track_regex_beatport,
     query_track,
     query_track_album,
     query_track_album_label,
     query_track_label,
+    replace_playlist_tracks,
     search_wrapper,
+    similar,
     spotify_auth,
     sync_playlist_history,
-    track_in_playlist,
+    tracks_similarity,
     update_playlist_description_with_date,
 )
+from src.track_index import TrackIndex
 from src.utils import append_to_hist_file
 
 configure_logging()
 logger = logging.getLogger("spotify_search")
 
+# Settings missing from the config files of earlier versions get their default
+search_strategy: str = getattr(config, "search_strategy", "v2")
+speculative_queries: int = getattr(config, "speculative_queries", 1)
+
 TRACKS_DICT_NAMES = ["id", "duration_ms", "href", "name", "popularity", "uri", "artists"]
 
 
-def _parse_artists(track: BeatportTrack, parse_track: bool) -> list[str]:
-    # Create a parsed artist and try both
-    artist_search = [*track.artists]
+RESOLVED_KEY = "_resolved"
+LAST_RESOLVED_KEY = "_last_resolved"
+WIDE_SEARCH_LIMIT = 50  # Maximum allowed by the Spotify search endpoint
+WIDE_SEARCH_PAGES = 2
+# Same threshold as best_of_multiple_matches
+WIDE_MATCH_THRESHOLD = 0.85
+WIDE_ARTIST_THRESHOLD = 0.8
+# Local index matches are accepted without any search, so be stricter
+LOCAL_MATCH_THRESHOLD = 0.9
+# Parse methods kept by local matches, the later ones drop or replace the mix
+LOCAL_MATCH_MAX_METHOD = 2
+# Minimum number of new label tracks to prefetch the label catalog
+LABEL_CATALOG_MIN_TRACKS = 20
+STRATEGY_STATS_PATH = f"{folder_path}/.search_strategy_stats.json"
+
+_track_searches = SingleFlight()
+
+
+class ResolutionTable:
+    """Spotify track ID resolved for each track during the run, by fingerprint.
+
+    The same track is often synced to several playlists in a run: the All Genres
+    and genre Top 100, the Daily Top and charts. It is only searched the first
+    time, tracks not found included.
+    """
+
+    _track_ids: ClassVar[dict[str, str | None]] = {}
+    n_lookups: ClassVar[int] = 0
+    n_resolved_before: ClassVar[int] = 0
+
+    @classmethod
+    def lookup(cls, track: BeatportTrack) -> tuple[bool, str | None]:
+        """Look up a track, return whether it was resolved and its Spotify ID."""
+        cls.n_lookups += 1
+        if track.fingerprint not in cls._track_ids:
+            return False, None
+        cls.n_resolved_before += 1
+        return True, cls._track_ids[track.fingerprint]
+
+    @classmethod
+    def is_resolved(cls, track: BeatportTrack) -> bool:
+        """Whether the track was already resolved, without counting a lookup."""
+        return track.fingerprint in cls._track_ids
+
+    @classmethod
+    def record(cls, track: BeatportTrack, track_id: str | None) -> None:
+        """Record the Spotify ID resolved for a track, None if not found.
+
+        The first resolution of a track is kept, so that it is added with the same
+        Spotify ID to every playlist of the run.
+        """
+        cls._track_ids.setdefault(track.fingerprint, track_id)
+
+    @classmethod
+    def log_stats(cls) -> None:
+        """Log the share of track searches resolved by an earlier search."""
+        if cls.n_lookups:
+            logger.info(
+                f"[+] Track resolutions: {len(cls._track_ids):,} unique tracks, "
+                f"{cls.n_resolved_before:,} of {cls.n_lookups:,} searches "
+                f"({cls.n_resolved_before / cls.n_lookups:.1%}) resolved earlier "
+                "in the run"
+            )
+
+
+def _parse_artists(track: BeatportTrack, parse_track: bool) -> Iterable[tuple[str, str]]:
+    """List the artists to search with and the kind of parsing applied to each.
+
+    Args:
+        track (BeatportTrack): Track to search for.
+        parse_track (bool): Whether to add parsed artist names.
+
+    Returns:
+        Iterable: Tuples of (variant kind, artist name), original artists first.
+    """
+    if parse_track:
+        return track.artist_variants
+    return [("original", artist_) for artist_ in track.artists]
+
+
+def _parse_track_variants(
+    track: BeatportTrack, parse_track: bool
+) -> Iterable[NameVariant]:
     if parse_track:
-        # Add parsed artist if not in list already
-        artist_search.extend(
-            x
-            for x in [re.sub(r"\s*\([^)]*\)", "", artist_) for artist_ in track.artists]
-            if x not in artist_search
-        )  # Remove (UK) for example
-        artist_search.extend(
-            x
-            for x in [re.sub(r"\W+", " ", artist_) for artist_ in track.artists]
-            if x not in artist_search
-        )  # Remove special characters, in case it is not handled by Spotify API
-        artist_search.extend(
-            x
-            for x in [re.sub(r"[^\w\s]", "", artist_) for artist_ in track.artists]
-            if x not in artist_search
-        )  # Remove special characters, in case it is not handled by Spotify API
-        artist_search.extend(
-            x
-            for x in [
-                re.sub(r"(?<=\w)[A-Z]", add_space, artist_) for artist_ in track.artists
+        return track.name_variants
+    return [NameVariant(0, track.name, track.mix)]
+
+
+def _count_skipped_variants(
+    track: BeatportTrack, parse_track: bool, n_queries: Callable[[], int]
+) -> Iterator[NameVariant]:
+    """Parse the track variants, counting the queries of the skipped ones.
+
+    Variants formatted as an earlier one are skipped by the parsing, each would
+    have produced `n_queries()` queries identical to earlier ones. They are counted
+    as plan duplicates, like the ones dropped by `_dedup_plan`.
+    """
+    n_methods = N_NAME_METHODS if parse_track else 1
+    next_method = 0
+    for variant in _parse_track_variants(track, parse_track):
+        if variant.method > next_method:
+            SearchMemo.record_plan_duplicates(
+                (variant.method - next_method) * n_queries()
+            )
+        next_method = variant.method + 1
+        yield variant
+    if next_method < n_methods:
+        SearchMemo.record_plan_duplicates((n_methods - next_method) * n_queries())
+
+
+class PlannedQuery(NamedTuple):
+    """A Spotify search query and the name and mix used to score its results.
+
+    The strategy identifies how the query was built: parse method, artist variant
+    and query template.
+    """
+
+    query: str
+    track: BeatportTrack
+    name_mix: str
+    artist: str
+    strategy: str
+
+
+class StrategyStats:
+    """Hit counts of the query strategies, per genre and per label.
+
+    Counts are persisted across runs and used to try first the strategies that
+    most often resolved the tracks of the same genre or label. Scopes that did not
+    resolve any track for `max_age_days` are dropped.
+    """
+
+    min_resolved: ClassVar[int] = 10
+    max_age_days: ClassVar[int] = 365
+    _stats: ClassVar[dict[str, dict[str, int]] | None] = None
+    n_resolved: ClassVar[int] = 0
+    n_searches_resolved: ClassVar[int] = 0
+
+    @classmethod
+    def _load(cls) -> dict[str, dict[str, int]]:
+        if cls._stats is None:
+            try:
+                with open(STRATEGY_STATS_PATH) as stats_file:
+                    cls._stats = json.load(stats_file)
+            except FileNotFoundError:
+                cls._stats = {}
+            except Exception as e:
+                logger.warning(f"Failed to load search strategy stats: {e}")
+                cls._stats = {}
+        return cls._stats
+
+    @staticmethod
+    def scopes(track: BeatportTrack, genre: str | None = None) -> list[str]:
+        """Statistics scopes a track belongs to."""
+        scopes = ["all", f"label:{track.label}"]
+        if genre:
+            scopes.append(f"genre:{genre}")
+        return scopes
+
+    @classmethod
+    def rank(
+        cls, plan: Iterable[PlannedQuery], scopes: list[str]
+    ) -> Iterable[PlannedQuery]:
+        """Order the plan by observed hit rate, keeping the default order on ties.
+
+        The plan is consumed lazily: queries are pulled until the ones of the best
+        rated strategies not yet sent are found, the others are kept for later.
+        """
+        stats = cls._load()
+        hit_rates: dict[str, float] = {}
+        for scope in scopes:
+            scope_stats = stats.get(scope, {})
+            n_resolved = scope_stats.get(RESOLVED_KEY, 0)
+            if n_resolved < cls.min_resolved:
+                continue
+            for strategy, n_hits in scope_stats.items():
+                if strategy not in (RESOLVED_KEY, LAST_RESOLVED_KEY):
+                    hit_rates[strategy] = hit_rates.get(strategy, 0) + n_hits / n_resolved
+        if not hit_rates:
+            return plan
+        return cls._rank_lazily(iter(plan), hit_rates)
+
+    @staticmethod
+    def _rank_lazily(
+        plan: Iterator[PlannedQuery], hit_rates: dict[str, float]
+    ) -> Iterator[PlannedQuery]:
+        pending: list[PlannedQuery] = []
+        for hit_rate in sorted(set(hit_rates.values()), reverse=True):
+            strategies = {
+                strategy for strategy, rate in hit_rates.items() if rate == hit_rate
+            }
+            missing = strategies - {planned.strategy for planned in pending}
+            while missing:
+                planned_query = next(plan, None)
+                if planned_query is None:
+                    break
+                pending.append(planned_query)
+                missing.discard(planned_query.strategy)
+            # Strategies with the same hit rate are kept in plan order
+            yield from (planned for planned in pending if planned.strategy in strategies)
+            pending = [
+                planned for planned in pending if planned.strategy not in strategies
             ]
-            if x not in artist_search
-        )  # Splitting artist name with a space after a capital letter
-        artist_search.extend(
-            x
-            for x in [re.sub(r"\s&.*$", "", artist_) for artist_ in track.artists]
-            if x not in artist_search
-        )  # Removing second part after &
-    return artist_search
-
-
-def _perform_artist_track_search(
-    track_: BeatportTrack, artist: str, silent: bool
-) -> str | None:
-    for track_name in [track_.name_mix]:
-        # # Search with Title, Mix, Artist, Release / Album and Label
-        # if not silent:
-        #     logger.info(
-        #         "\t[+] Searching for track: {} by {} on {} on {} label".format(
-        #             track_name, artist, track_.release, track_.label
-        #         )
-        #     )
-        # query = 'track:"{}" artist:"{}" album:"{}" label:"{}"'.format(
-        #     track_name, artist, track_.release, track_.label
-        # )
-        # if not silent:
-        #     logger.info("\t\t[+] Search Query: {}".format(query))
-        # search_results = search_wrapper(query)
-        # track_id = parse_search_results_spotify(search_results, track_)
-        # if track_id:
-        #     return track_id
-
-        # # Search with Title, Mix, Artist and Label, w/o Release / Album
-        # if not silent:
-        #     logger.info(
-        #         "[+]\tSearching for track: {} by {} on {} label".format(
-        #             track_name, artist, track_.label
-        #         )
-        #     )
-        # query = 'track:"{}" artist:"{}" label:"{}"'.format(
-        #     track_name, artist, track_.label
-        # )
-        # if not silent:
-        #     logger.info("\t\t[+] Search Query: {}".format(query))
-        # search_results = search_wrapper(query)
-        # track_id = parse_search_results_spotify(search_results, track_)
-        # if track_id:
-        #     return track_id
-
-        # Search with Title, Mix, Artist, Release / Album, w/o  Label
-        if not silent:
+        yield from pending
+        yield from plan
+
+    @classmethod
+    def record_hit(cls, strategy: str, scopes: list[str], n_searches: int) -> None:
+        """Record the strategy that resolved a track after n_searches searches."""
+        stats = cls._load()
+        today = datetime.now(UTC).date().toordinal()
+        for scope in scopes:
+            scope_stats = stats.setdefault(scope, {})
+            scope_stats[strategy] = scope_stats.get(strategy, 0) + 1
+            scope_stats[RESOLVED_KEY] = scope_stats.get(RESOLVED_KEY, 0) + 1
+            scope_stats[LAST_RESOLVED_KEY] = today
+        cls.n_resolved += 1
+        cls.n_searches_resolved += n_searches
+
+    @classmethod
+    def save(cls) -> None:
+        """Persist the statistics, dropping the scopes not resolved for long."""
+        if cls._stats is None:
+            return
+        # Scopes saved before the date was recorded are kept for max_age_days
+        today = datetime.now(UTC).date().toordinal()
+        cls._stats = {
+            scope: scope_stats
+            for scope, scope_stats in cls._stats.items()
+            if today - scope_stats.setdefault(LAST_RESOLVED_KEY, today)
+            <= cls.max_age_days
+        }
+        try:
+            # Replace the file at once, so that it is never left half written
+            tmp_path = f"{STRATEGY_STATS_PATH}.tmp"
+            with open(tmp_path, "w") as stats_file:
+                json.dump(cls._stats, stats_file)
+            os.replace(tmp_path, STRATEGY_STATS_PATH)
+        except Exception as e:
+            logger.warning(f"Failed to save search strategy stats: {e}")
+
+    @classmethod
+    def log_stats(cls) -> None:
+        """Log the mean number of searches per resolved track for the run."""
+        if cls.n_resolved:
             logger.info(
-                f"[+]\tSearching for track: {track_name} by {artist} "
-                f"on {track_.release} album"
+                f"[+] Resolved {cls.n_resolved:,} tracks with "
+                f"{cls.n_searches_resolved / cls.n_resolved:.2f} searches per track"
             )
-        query = f'track:"{track_name}" artist:"{artist}" album:"{track_.release}"'
-        if not silent:
-            logger.info(f"\t\t[+] Search Query: {query}")
-        search_results = search_wrapper(query)
-        track_id = parse_search_results_spotify(search_results, track_)
-        if track_id:
-            return track_id
 
-        # Search with Title, Artist, Release / Album and Label,
-        #  w/o Release and Label
-        if not silent:
-            logger.info(f"\t\t[+] Searching for track: {track_name} by {artist}")
-        query = f'track:"{track_name}" artist:"{artist}"'
-        if not silent:
-            logger.info(f"\t\t[+] Search Query: {query}")
-        search_results = search_wrapper(query)
-        track_id = parse_search_results_spotify(search_results, track_)
-        if track_id:
-            return track_id
-    return None
 
+def _dedup_plan(plan: Iterable[PlannedQuery]) -> Iterator[PlannedQuery]:
+    """Keep the first occurrence of each query, counting the dropped copies."""
+    seen_queries: set[str] = set()
+    for planned_query in plan:
+        if planned_query.query in seen_queries:
+            SearchMemo.record_plan_duplicates(1)
+        else:
+            seen_queries.add(planned_query.query)
+            yield planned_query
 
-def search_for_track_v2(
-    track: BeatportTrack, silent: bool = silent_search, parse_track: bool = parse_track
-) -> str | None:
-    """Search for a track on Spotify using various search strategies.
+
+def _build_query_plan(track: BeatportTrack, parse_track: bool) -> Iterator[PlannedQuery]:
+    """Generate the unique queries tried by `search_for_track_v2`, in cascade order.
+
+    Queries are generated lazily, so the name and artist variants are only parsed
+    when the first queries do not match. Parsed variants and artist variants often
+    produce identical queries, only the first occurrence is kept.
 
     Args:
-        track (BeatportTrack): Track dictionary.
-        silent (bool): Whether to suppress logging output.
+        track (BeatportTrack): Track to search for.
         parse_track (bool): Whether to parse the track name and mix.
 
     Returns:
-        str: Spotify track ID if found, otherwise None.
-
+        Iterator: The unique queries in cascade order.
     """
-    if parse_track:
-        track_parsed = [
-            track.model_copy(),
-            *parse_track_regex_beatport(track),
-        ]
-    else:
-        track_parsed = [track]
+    return _dedup_plan(_v2_queries(track, parse_track))
 
+
+def _v2_queries(track: BeatportTrack, parse_track: bool) -> Iterator[PlannedQuery]:
     artist_search = _parse_artists(track, parse_track)
+    # Two query templates per artist
+    track_variants = _count_skipped_variants(
+        track, parse_track, lambda: 2 * len(list(artist_search))
+    )
+    for variant in track_variants:
+        # Search artist and artist parsed if parsed is on
+        for artist_kind, artist in artist_search:
+            # Search with Title, Mix, Artist, Release / Album, w/o  Label
+            yield PlannedQuery(
+                f'track:"{variant.name_mix}" artist:"{artist}" album:"{track.release}"',
+                track,
+                variant.name_mix,
+                artist,
+                f"v2:m{variant.method}:{artist_kind}:album",
+            )
+            # Search with Title, Artist, w/o Release and Label
+            yield PlannedQuery(
+                f'track:"{variant.name_mix}" artist:"{artist}"',
+                track,
+                variant.name_mix,
+                artist,
+                f"v2:m{variant.method}:{artist_kind}:track",
+            )
+
 
-    for track_ in track_parsed:
-        # Create a field name mix according to Spotify formatting
-        track_.name_mix = "{}{}".format(
-            track_.name, "" if not track_.mix else f" - {track_.mix}"
+def _perform_planned_search(planned_query: PlannedQuery, silent: bool) -> str | None:
+    if not silent:
+        logger.info(
+            f"[+]\tSearching for track: {planned_query.track.name} "
+            f"by {planned_query.artist}"
         )
+        logger.info(f"\t\t[+] Search Query: {planned_query.query}")
+    search_results = search_wrapper(planned_query.query)
+    return parse_search_results_spotify(
+        search_results, planned_query.track, silent, planned_query.name_mix
+    )
 
-        # Search artist and artist parsed if parsed is on
-        for artist in artist_search:
-            track_id = _perform_artist_track_search(track_, artist, silent)
+
+class SpeculativeSearch:
+    """Send the first queries of a search plan concurrently.
+
+    See `speculative_queries` in the config. The first query in plan order with
+    a match wins, the searches sent for the next ones are wasted.
+    """
+
+    _executor: ClassVar[ThreadPoolExecutor | None] = None
+    n_sent: ClassVar[int] = 0
+    n_wasted: ClassVar[int] = 0
+
+    @classmethod
+    def _get_executor(cls) -> ThreadPoolExecutor:
+        if cls._executor is None:
+            cls._executor = ThreadPoolExecutor(
+                max_workers=speculative_queries, thread_name_prefix="spotify_search"
+            )
+        return cls._executor
+
+    @classmethod
+    def search(
+        cls, planned_queries: list[PlannedQuery], silent: bool
+    ) -> tuple[int, str | None]:
+        """Send the queries concurrently and keep the first match in plan order.
+
+        Args:
+            planned_queries (list): Queries to send, in plan order.
+            silent (bool): Whether to suppress logging output.
+
+        Returns:
+            tuple: Index of the matching query and Spotify track ID, (-1, None)
+                if no query matches.
+        """
+        executor = cls._get_executor()
+        futures = [
+            executor.submit(_perform_planned_search, planned_query, silent)
+            for planned_query in planned_queries
+        ]
+        for i_query, future in enumerate(futures):
+            track_id = future.result()
             if track_id:
-                return track_id
+                # Queries not started yet are not sent
+                n_wasted = sum(not pending.cancel() for pending in futures[i_query + 1 :])
+                cls.n_sent += i_query + 1 + n_wasted
+                cls.n_wasted += n_wasted
+                return i_query, track_id
+        cls.n_sent += len(futures)
+        return -1, None
+
+    @classmethod
+    def log_stats(cls) -> None:
+        """Log the share of speculative searches that were not needed."""
+        if cls.n_sent:
+            logger.info(
+                f"[+] Speculative searches: {cls.n_sent:,} sent, "
+                f"{cls.n_wasted / cls.n_sent:.1%} wasted"
+            )
+
+
+def _execute_query_plan(
+    track: BeatportTrack,
+    plan: Iterable[PlannedQuery],
+    scopes: list[str],
+    silent: bool,
+    search_version: str,
+) -> str | None:
+    """Send the planned queries, most successful strategies first, until a match.
+
+    The first `speculative_queries` queries are sent concurrently.
+    """
+    plan = iter(StrategyStats.rank(plan, scopes))
+
+    n_speculative = 0
+    if speculative_queries > 1:
+        first_queries = list(islice(plan, speculative_queries))
+        i_query, track_id = SpeculativeSearch.search(first_queries, silent)
+        if track_id:
+            StrategyStats.record_hit(first_queries[i_query].strategy, scopes, i_query + 1)
+            return track_id
+        n_speculative = len(first_queries)
+
+    for plan_index, planned_query in enumerate(plan, start=n_speculative):
+        track_id = _perform_planned_search(planned_query, silent)
+        if track_id:
+            StrategyStats.record_hit(planned_query.strategy, scopes, plan_index + 1)
+            return track_id
 
     logger.info(
-        " [Done] No exact matches on name and artists v2 : {} - {}{}".format(
+        " [Done] No exact matches on name and artists {} : {} - {}{}".format(
+            search_version,
             track.artists[0],
             track.name,
             "" if not track.mix else f" - {track.mix}",
@@ -195,8 +485,11 @@ def search_for_track_v2(
     return None
 
 
-def search_for_track_v3(
-    track: BeatportTrack, silent: bool = silent_search, parse_track: bool = parse_track
+def search_for_track_v2(
+    track: BeatportTrack,
+    silent: bool = silent_search,
+    parse_track: bool = parse_track,
+    genre: str | None = None,
 ) -> str | None:
     """Search for a track on Spotify using various search strategies.
 
@@ -204,19 +497,36 @@ def search_for_track_v3(
         track (BeatportTrack): Track dictionary.
         silent (bool): Whether to suppress logging output.
         parse_track (bool): Whether to parse the track name and mix.
+        genre (str, optional): Genre synced, to order strategies by genre hit rate.
 
     Returns:
         str: Spotify track ID if found, otherwise None.
 
     """
-    if parse_track:
-        track_parsed = [
-            track.model_copy(),
-            *parse_track_regex_beatport(track),
-        ]
-    else:
-        track_parsed = [track]
+    plan = _build_query_plan(track, parse_track)
+    return _execute_query_plan(
+        track, plan, StrategyStats.scopes(track, genre), silent, "v2"
+    )
+
+
+def search_for_track_v3(
+    track: BeatportTrack,
+    silent: bool = silent_search,
+    parse_track: bool = parse_track,
+    genre: str | None = None,
+) -> str | None:
+    """Search for a track on Spotify using various search strategies.
+
+    Args:
+        track (BeatportTrack): Track dictionary.
+        silent (bool): Whether to suppress logging output.
+        parse_track (bool): Whether to parse the track name and mix.
+        genre (str, optional): Genre synced, to order strategies by genre hit rate.
+
+    Returns:
+        str: Spotify track ID if found, otherwise None.
 
+    """
     queries_functions = [
         query_track_album_label,
         query_track_label,
@@ -224,73 +534,29 @@ def search_for_track_v3(
         query_track,
     ]
 
-    # Create a parsed artist and try both
-    # TODO: Export to function
-    artist_search = [*track.artists]
-    if parse_track:
-        # Add parsed artist if not in list already
-        artist_search.extend(
-            x
-            for x in [re.sub(r"\s*\([^)]*\)", "", artist_) for artist_ in track.artists]
-            if x not in artist_search
-        )  # Remove (UK) for example
-        artist_search.extend(
-            x
-            for x in [re.sub(r"\W+", " ", artist_) for artist_ in track.artists]
-            if x not in artist_search
-        )  # Remove special characters, in case it is not handled by Spotify API
-        artist_search.extend(
-            x
-            for x in [re.sub(r"[^\w\s]", "", artist_) for artist_ in track.artists]
-            if x not in artist_search
-        )  # Remove special characters, in case it is not handled by Spotify API
-        artist_search.extend(
-            x
-            for x in [
-                re.sub(r"(?<=\w)[A-Z]", add_space, artist_) for artist_ in track.artists
-            ]
-            if x not in artist_search
-        )  # Splitting artist name with a space after a capital letter
-        artist_search.extend(
-            x
-            for x in [re.sub(r"\s&.*$", "", artist_) for artist_ in track.artists]
-            if x not in artist_search
-        )  # Removing second part after &
-
     # Search artist and artist parsed if parsed is on
-    for artist in artist_search:
-        # Search track name and track name without mix (even if parsed is off)
-
-        for query_function in queries_functions:
-            for track_ in track_parsed:
-                # Create a field name mix according to Spotify formatting
-                track_.name_mix = "{}{}".format(
-                    track_.name,
-                    "" if not track_.mix else f" - {track_.mix}",
-                )
-                for track_name in [track_.name_mix]:  # , track_. name]:
-                    query = query_function(track_name, artist, track_, silent)
-                    if not silent:
-                        logger.info(f"\t\t[+] Search Query: {query}")
-                    search_results = search_wrapper(query)
-                    track_id = parse_search_results_spotify(search_results, track_)
-                    if track_id:
-                        return track_id
-
-    logger.info(
-        " [Done] No exact matches on name and artists v2 : {} - {}{}".format(
-            track.artists[0],
-            track.name,
-            "" if not track.mix else f" - {track.mix}",
+    plan = (
+        PlannedQuery(
+            query_function(variant.name_mix, artist, track, silent=True),
+            track,
+            variant.name_mix,
+            artist,
+            f"v3:m{variant.method}:{artist_kind}:{query_function.__name__}",
         )
+        for artist_kind, artist in _parse_artists(track, parse_track)
+        for query_function in queries_functions
+        for variant in _count_skipped_variants(track, parse_track, lambda: 1)
+    )
+    return _execute_query_plan(
+        track, _dedup_plan(plan), StrategyStats.scopes(track, genre), silent, "v3"
     )
-
-    # Possible to use return search_for_track(track) but do not improve search results
-    return None
 
 
 def search_for_track_v4(
-    track: BeatportTrack, silent: bool = silent_search, parse_track: bool = parse_track
+    track: BeatportTrack,
+    silent: bool = silent_search,
+    parse_track: bool = parse_track,
+    genre: str | None = None,
 ) -> str | None:
     """Search for a track on Spotify using various search strategies.
 
@@ -298,72 +564,368 @@ def search_for_track_v4(
         track (BeatportTrack): Track dictionary.
         silent (bool): Whether to suppress logging output.
         parse_track (bool): Whether to parse the track name and mix.
+        genre (str, optional): Genre synced, to order strategies by genre hit rate.
 
     Returns:
         str: Spotify track ID if found, otherwise None.
 
     """
-    query = " ".join(
-        [
-            track.name,
-            " ".join(track.artists),
-            " ".join(track.remixers),
-            # track.mix,
-            # track.release,
-            # track.label,
-        ]
+    artists = " ".join(track.artists)
+    remixers = " ".join(track.remixers)
+    plan = [
+        PlannedQuery(
+            f"{track.name} {artists} {remixers}",
+            track,
+            track.full_name,
+            artists,
+            "v4:name_artists_remixers",
+        ),
+        PlannedQuery(
+            f"{track.name} {artists} {remixers} {track.mix}",
+            track,
+            track.full_name,
+            artists,
+            "v4:name_artists_remixers_mix",
+        ),
+    ]
+    return _execute_query_plan(
+        track, _dedup_plan(plan), StrategyStats.scopes(track, genre), silent, "v4"
     )
+
+
+def _wide_queries(track: BeatportTrack) -> list[str]:
+    # Without the mix nor the album, to get all the versions of the track at once
+    return [
+        f'track:"{track.name}" artist:"{track.artists[0]}"',
+        " ".join([track.name, track.mix, *track.artists]),
+    ]
+
+
+def score_wide_candidates(
+    track: BeatportTrack, track_variants: Iterable[NameVariant], candidates: list[dict]
+) -> list[float]:
+    """Score Spotify search results against a Beatport track.
+
+    The score is the best `tracks_similarity` over the parsed variants of the
+    track, which is penalized when the durations differ, weighted by the share of
+    Beatport artists credited on the candidate.
+
+    Args:
+        track (BeatportTrack): Track to search for.
+        track_variants (Iterable): Parsed name and mix variants of the track.
+        candidates (list): Spotify search result items.
+
+    Returns:
+        list: Score of each candidate, between 0 and 1.
+
+    """
+    variants_similarity = [
+        tracks_similarity(
+            track,
+            candidates,
+            source_name=variant.name_mix,
+            skip_mismatched_durations=False,
+        )
+        for variant in track_variants
+    ]
+    scores = []
+    for i_candidate, candidate in enumerate(candidates):
+        name_score = max(similarity[i_candidate] for similarity in variants_similarity)
+        candidate_artists = [artist["name"].lower() for artist in candidate["artists"]]
+        n_artists_credited = sum(
+            any(
+                similar(artist, candidate_artist) >= WIDE_ARTIST_THRESHOLD
+                for candidate_artist in candidate_artists
+            )
+            for artist in track.norm_artists
+        )
+        artist_overlap = n_artists_credited / len(track.artists)
+        scores.append(name_score * (0.5 + 0.5 * artist_overlap))
+    return scores
+
+
+def search_for_track_wide(
+    track: BeatportTrack,
+    silent: bool = silent_search,
+    parse_track: bool = parse_track,
+    genre: str | None = None,
+) -> str | None:
+    """Search for a track on Spotify with broad queries and score results locally.
+
+    Falls back to `search_for_track_v2` when no candidate clears the threshold.
+
+    Args:
+        track (BeatportTrack): Track dictionary.
+        silent (bool): Whether to suppress logging output.
+        parse_track (bool): Whether to parse the track name and mix.
+        genre (str, optional): Genre synced, to order strategies by genre hit rate.
+
+    Returns:
+        str: Spotify track ID if found, otherwise None.
+
+    """
+    track_variants = _parse_track_variants(track, parse_track)
+    best_id, best_score = None, 0.0
+    for query in _wide_queries(track):
+        for page in range(WIDE_SEARCH_PAGES):
+            if not silent:
+                logger.info(f"\t\t[+] Wide search query: {query}, page {page + 1}")
+            candidates = search_wrapper(
+                query, limit=WIDE_SEARCH_LIMIT, offset=page * WIDE_SEARCH_LIMIT
+            )["tracks"]["items"]
+            if candidates:
+                scores = score_wide_candidates(track, track_variants, candidates)
+                page_best_score = max(scores)
+                if page_best_score > best_score:
+                    best_score = page_best_score
+                    best_id = candidates[scores.index(page_best_score)]["id"]
+            if best_score >= WIDE_MATCH_THRESHOLD or len(candidates) < WIDE_SEARCH_LIMIT:
+                break
+        if best_score >= WIDE_MATCH_THRESHOLD:
+            if not silent:
+                logger.info(f"\t\t\t[+] Wide search match {best_score:.2f}: {best_id}")
+            return best_id
+
     if not silent:
-        logger.info(f"\t\t[+] Search Query: {query}")
-    search_results = search_wrapper(query)
-    track_id = parse_search_results_spotify(search_results, track)
-    if track_id:
-        return track_id
+        logger.info(
+            f"\t\t[+] No wide search match (best {best_score:.2f}), "
+            "falling back to narrow queries"
+        )
+    return search_for_track_v2(track, silent=silent, parse_track=parse_track, genre=genre)
 
-    query = " ".join(
-        [
-            track.name,
-            " ".join(track.artists),
-            " ".join(track.remixers),
-            track.mix,
-            # track.release,
-            # track.label,
+
+def match_release_tracks(
+    tracks: list[BeatportTrack], silent: bool = silent_search
+) -> list[str | None]:
+    """Match the tracks sharing a release against the tracklist of its Spotify album.
+
+    Releases with a single track are left to `search_track_function`.
+
+    Args:
+        tracks (list): Tracks to search for.
+        silent (bool): Whether to suppress logging output.
+
+    Returns:
+        list: Spotify track ID of each track, None if not matched.
+
+    """
+    releases = defaultdict(list)
+    for i_track, track in enumerate(tracks):
+        releases[(track.release, track.label)].append(i_track)
+
+    track_ids: list[str | None] = [None] * len(tracks)
+    n_releases = 0
+    for (release, label), i_tracks in releases.items():
+        if len(i_tracks) < 2:
+            continue
+        album_tracks = get_album_tracks(release, label)
+        if not album_tracks:
+            continue
+        n_releases += 1
+        for i_track in i_tracks:
+            track = tracks[i_track]
+            scores = score_wide_candidates(
+                track, _parse_track_variants(track, parse_track), album_tracks
+            )
+            best_score = max(scores)
+            if best_score >= WIDE_MATCH_THRESHOLD:
+                track_ids[i_track] = album_tracks[scores.index(best_score)]["id"]
+
+    if n_releases:
+        n_matched = sum(track_id is not None for track_id in track_ids)
+        logger.info(
+            f"[+] Matched {n_matched} tracks out of {len(tracks)} "
+            f"from {n_releases} Spotify albums"
+        )
+    return track_ids
+
+
+def _catalog_key(track_name: str) -> str:
+    # Spotify names are formatted as "Name - Mix", Beatport names have no mix
+    return track_name.split(" - ")[0].strip().lower()
+
+
+def match_label_catalog(
+    label: str, tracks: list[BeatportTrack], silent: bool = silent_search
+) -> list[str | None]:
+    """Match tracks against the Spotify catalog of their label, without searches.
+
+    Args:
+        label (str): Label name.
+        tracks (list): Tracks to search for.
+        silent (bool): Whether to suppress logging output.
+
+    Returns:
+        list: Spotify track ID of each track, None if not matched.
+
+    """
+    catalog_index = defaultdict(list)
+    for catalog_track in get_label_catalog(label):
+        catalog_index[_catalog_key(catalog_track["name"])].append(catalog_track)
+
+    track_ids: list[str | None] = [None] * len(tracks)
+    for i_track, track in enumerate(tracks):
+        track_variants = _parse_track_variants(track, parse_track)
+        candidates = [
+            candidate
+            for key in {_catalog_key(variant.name) for variant in track_variants}
+            for candidate in catalog_index.get(key, [])
         ]
+        if not candidates:
+            continue
+        scores = score_wide_candidates(track, track_variants, candidates)
+        best_score = max(scores)
+        if best_score >= WIDE_MATCH_THRESHOLD:
+            track_ids[i_track] = candidates[scores.index(best_score)]["id"]
+
+    if catalog_index:
+        n_matched = sum(track_id is not None for track_id in track_ids)
+        logger.info(
+            f"[+] Matched {n_matched} tracks out of {len(tracks)} "
+            f"from the {label} Spotify catalog"
+        )
+    return track_ids
+
+
+def _match_tracks_in_bulk(
+    tracks: list[BeatportTrack], label: str | None, silent: bool
+) -> list[str | None]:
+    """Match tracks from the label catalog, then from their release album.
+
+    Matched tracks are recorded in the `ResolutionTable`.
+    """
+    track_ids: list[str | None] = [None] * len(tracks)
+    if label and len(tracks) >= LABEL_CATALOG_MIN_TRACKS:
+        track_ids = match_label_catalog(label, tracks, silent)
+
+    unmatched = [i_track for i_track, track_id in enumerate(track_ids) if not track_id]
+    release_track_ids = match_release_tracks([tracks[i] for i in unmatched], silent)
+    for i_track, track_id in zip(unmatched, release_track_ids, strict=True):
+        track_ids[i_track] = track_id
+
+    for track, track_id in zip(tracks, track_ids, strict=True):
+        if track_id:
+            ResolutionTable.record(track, track_id)
+    return track_ids
+
+
+def search_for_track_local(
+    track: BeatportTrack, silent: bool = silent_search, parse_track: bool = parse_track
+) -> str | None:
+    """Match a track against the local index of the Spotify tracks already seen.
+
+    Only the name variants keeping the mix are scored, and the durations must match
+    without the exception made for edits.
+
+    Args:
+        track (BeatportTrack): Track dictionary.
+        silent (bool): Whether to suppress logging output.
+        parse_track (bool): Whether to parse the track name and mix.
+
+    Returns:
+        str: Spotify track ID if a confident match is found, otherwise None.
+
+    """
+    candidates = [
+        candidate
+        for candidate in TrackIndex.candidates(track.name)
+        if do_durations_match(track.duration_ms, candidate["duration_ms"], silent=True)
+    ]
+    if not candidates:
+        return None
+    track_variants = takewhile(
+        lambda variant: variant.method <= LOCAL_MATCH_MAX_METHOD,
+        _parse_track_variants(track, parse_track),
     )
+    scores = score_wide_candidates(track, track_variants, candidates)
+    best_score = max(scores)
+    if best_score < LOCAL_MATCH_THRESHOLD:
+        return None
+    track_id = candidates[scores.index(best_score)]["id"]
+    TrackIndex.n_local_matches += 1
     if not silent:
-        logger.info(f"\t\t[+] Search Query: {query}")
-    search_results = search_wrapper(query)
-    track_id = parse_search_results_spotify(search_results, track)
-    if track_id:
-        return track_id
+        logger.info(f"\t\t[+] Local index match {best_score:.2f}: {track_id}")
+    return track_id
 
-    logger.info(
-        " [Done] No exact matches on name and artists v2 : {} - {}{}".format(
-            track.artists[0],
-            track.name,
-            "" if not track.mix else f" - {track.mix}",
-        )
-    )
 
-    # Possible to use return search_for_track(track) but do not improve search results
-    return None
+def search_for_track_isrc(
+    track: BeatportTrack, silent: bool = silent_search
+) -> str | None:
+    """Search for a track on Spotify by its ISRC.
+
+    Args:
+        track (BeatportTrack): Track dictionary, with an ISRC.
+        silent (bool): Whether to suppress logging output.
+
+    Returns:
+        str: Spotify track ID if found, otherwise None.
+
+    """
+    query = f"isrc:{track.isrc}"
+    if not silent:
+        logger.info(f"\t\t[+] Search Query: {query}")
+    found_tracks = search_wrapper(query)["tracks"]["items"]
+    if not found_tracks:
+        return None
+    # The same recording can be on several releases, prefer the same duration
+    for found_track in found_tracks:
+        if do_durations_match(track.duration_ms, found_track.get("duration_ms"), silent):
+            return found_track["id"]
+    return found_tracks[0]["id"]
 
 
 def search_track_function(
-    track: BeatportTrack, silent: bool = silent_search, parse_track: bool = parse_track
+    track: BeatportTrack,
+    silent: bool = silent_search,
+    parse_track: bool = parse_track,
+    genre: str | None = None,
 ) -> str | None:
     """Search for a track on Spotify using various search strategies.
 
+    The local index of known Spotify tracks is checked first, without any
+    search. Tracks with an ISRC are then searched by ISRC, with a single query.
+    Tracks are only searched once per run, see `ResolutionTable`, and threads
+    searching for the same track, by fingerprint, at the same time share a single
+    search.
+
     Args:
         track (BeatportTrack): Track dictionary.
         silent (bool): Whether to suppress logging output.
         parse_track (bool): Whether to parse the track name and mix.
+        genre (str, optional): Genre synced, to order strategies by genre hit rate.
 
     Returns:
         str: Spotify track ID if found, otherwise None.
 
     """
-    return search_for_track_v2(track=track, silent=silent, parse_track=parse_track)
+    is_resolved, track_id = ResolutionTable.lookup(track)
+    if is_resolved:
+        return track_id
+    track_id = _track_searches.do(
+        track.fingerprint,
+        partial(_search_track, track, silent, parse_track, genre),
+    )
+    ResolutionTable.record(track, track_id)
+    return track_id
+
+
+def _search_track(
+    track: BeatportTrack, silent: bool, parse_track: bool, genre: str | None
+) -> str | None:
+    track_id = search_for_track_local(track, silent=silent, parse_track=parse_track)
+    if track_id:
+        return track_id
+    if track.isrc:
+        track_id = search_for_track_isrc(track, silent=silent)
+        if track_id:
+            return track_id
+    if search_strategy == "wide":
+        return search_for_track_wide(
+            track=track, silent=silent, parse_track=parse_track, genre=genre
+        )
+    return search_for_track_v2(
+        track=track, silent=silent, parse_track=parse_track, genre=genre
+    )
 
 
 #
@@ -404,12 +966,6 @@ def _get_or_create_playlists(
     return playlists
 
 
-def _clear_daily_playlist(playlists: list[dict], daily_mode: bool) -> None:
-    if daily_mode:
-        # Clear daily playlist
-        clear_playlist(playlists[1]["id"])
-
-
 def add_new_tracks_to_playlist(genre: str, tracks_dict: list) -> None:
     """Add new tracks to a playlist.
 
@@ -427,19 +983,22 @@ def add_new_tracks_to_playlist(genre: str, tracks_dict: list) -> None:
     playlists = _get_or_create_playlists(
         persistent_top_100_playlist_name, daily_top_n_playlist_name, daily_mode
     )
-    _clear_daily_playlist(playlists, daily_mode)
+
+    # Scan the persistent playlist once instead of once per found track
+    persistent_playlist_track_ids = get_playlist_track_ids(playlists[0]["id"])
 
     persistent_top_100_track_ids = list()
     daily_top_n_track_ids = list()
     for track_count, track in enumerate(tracks_dict):
         try:
-            track_id = search_track_function(track)
+            track_id = search_track_function(track, genre=genre)
         except ReadTimeout:
-            track_id = search_track_function(track)
+            track_id = search_track_function(track, genre=genre)
         except spotipy.exceptions.SpotifyException:
-            track_id = search_track_function(track)
-        if track_id and not track_in_playlist(playlists[0]["id"], track_id):
+            track_id = search_track_function(track, genre=genre)
+        if track_id and track_id not in persistent_playlist_track_ids:
             persistent_top_100_track_ids.append(track_id)
+            persistent_playlist_track_ids.add(track_id)
         if track_id and track_count < daily_n_track:
             daily_top_n_track_ids.append(track_id)
     logger.info(
@@ -452,7 +1011,8 @@ def add_new_tracks_to_playlist(genre: str, tracks_dict: list) -> None:
             f"[+] Adding {len(daily_top_n_track_ids)} new "
             f'tracks to the playlist: "{daily_top_n_playlist_name}"'
         )
-        add_tracks_to_playlist(playlists[1]["id"], daily_top_n_track_ids)
+        # Replace the daily playlist content in one go
+        replace_playlist_tracks(playlists[1]["id"], daily_top_n_track_ids)
 
 
 def add_new_tracks_to_playlist_chart_label(
@@ -461,6 +1021,7 @@ def add_new_tracks_to_playlist_chart_label(
     use_prefix: bool = True,
     silent: bool = silent_search,
     uri: str | None = None,
+    label: str | None = None,
 ) -> None:
     """Add tracks from Beatport to a Spotify playlist.
 
@@ -470,6 +1031,8 @@ def add_new_tracks_to_playlist_chart_label(
         use_prefix (bool): Add a prefix to the playlist name as defined in config.
         silent (bool): If True, do not display searching details except errors.
         uri (str): Optional Beatport URI/code for logging.
+        label (str): Label name for label playlists, to match tracks against the
+            label Spotify catalog.
     """
     persistent_playlist_name = f"{playlist_prefix}{title}" if use_prefix else title
     logger.info(f'[+] Identifying new tracks for playlist: "{persistent_playlist_name}"')
@@ -495,6 +1058,25 @@ def add_new_tracks_to_playlist_chart_label(
     new_history_tracks = []
     track_count = 0
 
+    # Match the new tracks in bulk, from the label catalog and release albums,
+    # the tracks resolved earlier in the run are looked up by search_track_function
+    hist_artist_names = set(df_playlist_hist["artist_name"].values)
+    new_track_indices = [
+        track_count_tot
+        for track_count_tot, track in enumerate(tracks_dict)
+        if f"{track.artists[0]} - {track.name} - {track.mix}" not in hist_artist_names
+        and not ResolutionTable.is_resolved(track)
+    ]
+    bulk_track_ids = dict(
+        zip(
+            new_track_indices,
+            _match_tracks_in_bulk(
+                [tracks_dict[i] for i in new_track_indices], label, silent
+            ),
+            strict=True,
+        )
+    )
+
     for track_count_tot, track in enumerate(tracks_dict):
         track_artist_name = f"{track.artists[0]} - {track.name} - {track.mix}"
         if not silent:
@@ -504,7 +1086,7 @@ def add_new_tracks_to_playlist_chart_label(
             )
 
         if track_artist_name not in df_playlist_hist["artist_name"].values:
-            track_id = search_track_function(track)
+            track_id = bulk_track_ids.get(track_count_tot) or search_track_function(track)
 
             if track_id and track_id not in df_playlist_hist["track_id"].values:
                 if not silent:
@@ -604,6 +1186,7 @@ def _process_genre_tracks(
     n_daily_tracks: int,
     playlists: list[dict],
     silent: bool,
+    genre: str | None = None,
 ) -> tuple[list[str], list[str], list[dict], list[dict]]:
     persistent_track_ids = []
     daily_top_n_track_ids = []
@@ -618,7 +1201,7 @@ def _process_genre_tracks(
                 f": nb {track_count_tot} out of {len(top_100_chart)}"
             )
 
-        track_id = search_track_function(track)
+        track_id = search_track_function(track, genre=genre)
 
         if track_id:
             if track_id not in df_persistent_hist["track_id"].values:
@@ -666,10 +1249,8 @@ def _backfill_daily_playlist(
     df_persistent_hist: pd.DataFrame,
     df_daily_hist: pd.DataFrame,
     daily_top_n_track_ids: list[str],
-    daily_top_n_playlist_name: str,
-    playlists: list[dict],
-) -> None:
-    """Add more tracks to daily genre playlist if not enough found.
+) -> list[str]:
+    """Select more tracks for the daily genre playlist if not enough found.
 
     Args:
         n_daily_tracks (int): Number of tracks already in the playlist.
@@ -677,13 +1258,13 @@ def _backfill_daily_playlist(
         df_daily_hist (pd.DataFrame): Daily playlist history.
         daily_top_n_track_ids (list[str]): List of track IDs already
          added to daily playlist.
-        daily_top_n_playlist_name (str): Name of the daily playlist.
-        playlists (list[dict]): List of playlist dictionaries.
-    """
-    if n_daily_tracks >= daily_n_track:
-        return
 
+    Returns:
+        list[str]: Extra track IDs to add to the daily playlist.
+    """
     extra_daily_top_n_track_ids: list[str] = []
+    if n_daily_tracks >= daily_n_track:
+        return extra_daily_top_n_track_ids
 
     # Build list of persistent track ids (freshest first).
     # Prefer local history (`df_persistent_hist`) even if empty; then
@@ -706,16 +1287,41 @@ def _backfill_daily_playlist(
             extra_daily_top_n_track_ids.append(track_id)
             n_daily_tracks += 1
 
+    del reversed_persistent_ids, daily_existing_ids
+    gc.collect()
+
+    return extra_daily_top_n_track_ids
+
+
+def _update_daily_playlist(
+    playlist: dict,
+    daily_top_n_track_ids: list[str],
+    extra_daily_top_n_track_ids: list[str],
+    replace: bool,
+) -> None:
+    """Write the daily playlist in one go.
+
+    Args:
+        playlist (dict): Daily playlist dictionary.
+        daily_top_n_track_ids (list[str]): New top N track IDs, in chart order.
+        extra_daily_top_n_track_ids (list[str]): Backfill track IDs.
+        replace (bool): If True the playlist content is replaced by the tracks,
+         otherwise the tracks are added to the existing content.
+    """
+    daily_track_ids = daily_top_n_track_ids + extra_daily_top_n_track_ids
     if extra_daily_top_n_track_ids:
         logger.warning(
             f"[+] Adding {len(extra_daily_top_n_track_ids)} extra new "
-            f'tracks to the playlist: "{daily_top_n_playlist_name}"'
+            f'tracks to the playlist: "{playlist["name"]}"'
         )
-        add_tracks_to_playlist(playlists[1]["id"], extra_daily_top_n_track_ids)
-        update_playlist_description_with_date(playlists[1])
 
-    del extra_daily_top_n_track_ids, reversed_persistent_ids, daily_existing_ids
-    gc.collect()
+    if replace:
+        # Single replace instead of clear then add, never leaves the playlist empty
+        replace_playlist_tracks(playlist["id"], daily_track_ids)
+        update_playlist_description_with_date(playlist)
+    elif daily_track_ids:
+        add_tracks_to_playlist(playlist["id"], daily_track_ids)
+        update_playlist_description_with_date(playlist)
 
 
 def add_new_tracks_to_playlist_genre(
@@ -741,11 +1347,12 @@ def add_new_tracks_to_playlist_genre(
     df_persistent_hist = sync_playlist_history(playlists[0], digging_mode)
 
     df_daily_hist = pd.DataFrame()
+    replace_daily = False
     if daily_mode:
         if digging_mode == "":
-            # If digging_mode is empty, clear daily playlist and start fresh
-            logger.info(f"Clearing daily playlist for {genre} as digging_mode is empty")
-            clear_playlist(playlists[1]["id"])
+            # If digging_mode is empty, rebuild the daily playlist from scratch
+            logger.info(f"Replacing daily playlist for {genre} as digging_mode is empty")
+            replace_daily = True
             df_daily_hist = pd.DataFrame(
                 columns=[
                     "playlist_id",
@@ -759,7 +1366,7 @@ def add_new_tracks_to_playlist_genre(
             df_daily_hist = sync_playlist_history(playlists[1], digging_mode)
 
     n_daily_tracks = 0
-    if daily_mode:
+    if daily_mode and not replace_daily:
         spotify_ins = spotify_auth()
         daily_playlist = spotify_ins.playlist(
             playlist_id=playlists[1]["id"], fields="tracks(total)"
@@ -778,6 +1385,7 @@ def add_new_tracks_to_playlist_genre(
         n_daily_tracks,
         playlists,
         silent,
+        genre,
     )
 
     if persistent_track_ids:
@@ -794,28 +1402,32 @@ def add_new_tracks_to_playlist_genre(
             f"playlist: {persistent_top_100_playlist_name}"
         )
 
-    if daily_mode and daily_top_n_track_ids:
-        logger.warning(
-            f"[+] Adding {len(daily_top_n_track_ids)} new tracks to the playlist:"
-            f' "{daily_top_n_playlist_name}"'
-        )
-        add_tracks_to_playlist(playlists[1]["id"], daily_top_n_track_ids)
-        update_playlist_description_with_date(playlists[1])
-        append_to_hist_file(pd.DataFrame(new_daily_history_tracks))
-    else:
-        logger.info(
-            f'[+] No new tracks to add to the playlist: "{daily_top_n_playlist_name}"'
-        )
-
     if daily_mode:
-        _backfill_daily_playlist(
+        if daily_top_n_track_ids:
+            logger.warning(
+                f"[+] Adding {len(daily_top_n_track_ids)} new tracks to the playlist:"
+                f' "{daily_top_n_playlist_name}"'
+            )
+        else:
+            logger.info(
+                f'[+] No new tracks to add to the playlist: "{daily_top_n_playlist_name}"'
+            )
+        # Computed locally from the persistent history, written with the new tracks
+        extra_daily_top_n_track_ids = _backfill_daily_playlist(
             n_daily_tracks + len(daily_top_n_track_ids),
             df_persistent_hist,
             df_daily_hist,
             daily_top_n_track_ids,
-            daily_top_n_playlist_name,
-            playlists,
         )
+        _update_daily_playlist(
+            playlists[1],
+            daily_top_n_track_ids,
+            extra_daily_top_n_track_ids,
+            replace=replace_daily,
+        )
+        if new_daily_history_tracks:
+            append_to_hist_file(pd.DataFrame(new_daily_history_tracks))
+        del extra_daily_top_n_track_ids
 
     # Clean up all temporary data structures
     del df_persistent_hist, df_daily_hist
@@ -2,13 +2,21 @@
 
 import asyncio
 import gc
+import hashlib
+import json
 import logging
+import os
 import re
 import socket
+import threading
+import time
 import webbrowser
+from collections.abc import Callable
+from concurrent.futures import Future
 from datetime import UTC, datetime
 from difflib import SequenceMatcher
-from typing import ClassVar, TypedDict, cast
+from functools import lru_cache, partial
+from typing import Any, ClassVar, TypedDict, cast
 
 import numpy as np
 import pandas as pd
@@ -16,6 +24,7 @@ import spotipy
 from spotipy import SpotifyException, oauth2
 from spotipy.oauth2 import CacheFileHandler
 
+from src import config
 from src.config import (
     add_at_top_playlist,
     client_id,
@@ -29,8 +38,8 @@ from src.config import (
     username,
 )
 from src.configure_logging import configure_logging
-from src.models import BeatportTrack
-from src.search_utils import clean_track_name
+from src.models import BeatportTrack, validate_tracks
+from src.track_index import TrackIndex
 from src.utils import append_to_hist_file, load_hist_file
 
 
@@ -55,8 +64,18 @@ class PlaylistDescription(TypedDict):
 configure_logging()
 logger = logging.getLogger("spotify_utils")
 
+# Settings missing from the config files of earlier versions get their default
+duration_tolerance_ms: int = getattr(config, "duration_tolerance_ms", 2000)
+spotify_searches_per_second: float = getattr(config, "spotify_searches_per_second", 10)
+
 TRACKS_DICT_NAMES = ["id", "duration_ms", "href", "name", "popularity", "uri", "artists"]
 handler = CacheFileHandler(cache_path=f"{folder_path}/.spotify_cache")
+PLAYLISTS_CACHE_PATH = f"{folder_path}/.spotify_playlists.json"
+# Score factor of the found tracks whose duration differs from the source one
+DURATION_MISMATCH_PENALTY = 0.95
+# Range of the duration of an edit, as a share of the duration of the source track
+EDIT_DURATION_RATIOS = (0.3, 0.9)
+EDIT_PATTERN = re.compile(r"\bedit\b", re.IGNORECASE)
 sp_oauth = oauth2.SpotifyOAuth(
     client_id, client_secret, redirect_uri, cache_handler=handler, scope=scope
 )
@@ -108,10 +127,27 @@ sp_oauth = oauth2.SpotifyOAuth(
 #     auth=token_info["access_token"], requests_timeout=15, retries=3, backoff_factor=15
 # )
 class SpotifyClient:
-    """Singleton for Spotify client to ensure session reuse without global variables."""
+    """Singleton for Spotify client to ensure session reuse without global variables.
+
+    It also holds the user's playlist name -> ID directory. The directory is persisted
+    at PLAYLISTS_CACHE_PATH with the playlist total and a signature of the first
+    listing page, which are checked with a single request at startup. When they
+    changed, the persisted directory is used right away and refreshed in the
+    background.
+
+    A playlist renamed beyond the first page changes neither of them: its old name
+    keeps resolving until the directory is refreshed, and meanwhile a miss is
+    double-checked with a search before the playlist is considered missing.
+    """
 
     _instance: ClassVar[spotipy.Spotify | None] = None
     _playlists_cache: ClassVar[dict[str, str] | None] = None
+    _playlists_total: ClassVar[int | None] = None
+    _playlists_signature: ClassVar[str | None] = None
+    _added_playlists: ClassVar[dict[str, str]] = {}
+    _refresh_thread: ClassVar[threading.Thread | None] = None
+    _playlists_refreshed: ClassVar[bool] = False
+    _playlists_lock: ClassVar[threading.Lock] = threading.Lock()
 
     @classmethod
     def get_instance(cls) -> spotipy.Spotify:
@@ -128,9 +164,117 @@ class SpotifyClient:
     @classmethod
     def get_cached_playlist_id(cls, playlist_name: str) -> str | None:
         """Get playlist ID from cache, fetching all playlists if cache is empty."""
-        if cls._playlists_cache is None:
+        if cls._playlists_cache is None and not cls.load_playlists_cache():
             cls.refresh_playlists_cache()
-        return cls._playlists_cache.get(playlist_name) if cls._playlists_cache else None
+        playlist_id = (
+            cls._playlists_cache.get(playlist_name) if cls._playlists_cache else None
+        )
+        refresh_thread = cls._refresh_thread
+        if playlist_id is None and refresh_thread is not None:
+            # Miss while refreshing, wait for the full directory before giving up
+            refresh_thread.join()
+            cls._refresh_thread = None
+            if cls._playlists_cache:
+                playlist_id = cls._playlists_cache.get(playlist_name)
+        return playlist_id
+
+    @classmethod
+    def is_playlists_cache_complete(cls) -> bool:
+        """Whether a miss in the directory means that the playlist does not exist."""
+        return (
+            cls._playlists_cache is not None
+            and cls._refresh_thread is None
+            and cls._playlists_refreshed
+        )
+
+    @classmethod
+    def add_playlist(cls, playlist_name: str, playlist_id: str) -> None:
+        """Add a playlist to the directory, e.g. after creating it."""
+        with cls._playlists_lock:
+            cls._added_playlists[playlist_name] = playlist_id
+            if cls._playlists_cache is None:
+                return
+            if playlist_name not in cls._playlists_cache:
+                cls._playlists_total = (cls._playlists_total or 0) + 1
+            cls._playlists_cache[playlist_name] = playlist_id
+        cls.save_playlists_cache()
+
+    @staticmethod
+    def _first_page_signature(playlists_page: dict) -> str:
+        """Signature of the first listing page, changes with renames and additions."""
+        page_content = "|".join(
+            f"{playlist['id']}:{playlist['name']}"
+            for playlist in playlists_page["items"]
+            if playlist
+        )
+        return hashlib.sha1(page_content.encode()).hexdigest()
+
+    @classmethod
+    def load_playlists_cache(cls) -> bool:
+        """Load the persisted directory and check it against the first listing page.
+
+        Returns:
+            bool: True if a directory is available, False if it must be fetched.
+        """
+        try:
+            with open(PLAYLISTS_CACHE_PATH) as cache_file:
+                persisted = json.load(cache_file)
+            playlists_page = cls.get_instance().current_user_playlists(limit=50)
+        except FileNotFoundError:
+            return False
+        except Exception as e:
+            logger.warning(f"Failed to load persisted playlists cache: {e}")
+            return False
+
+        cache: dict[str, str] = persisted["playlists"]
+        # New playlists are listed first, add them right away
+        for playlist in playlists_page["items"]:
+            if playlist and playlist["owner"]["id"] == username:
+                cache[playlist["name"]] = playlist["id"]
+                PlaylistDescriptionWriter.remember(
+                    playlist["id"], playlist.get("description")
+                )
+        cls._playlists_cache = cache
+
+        signature = cls._first_page_signature(playlists_page)
+        if (
+            persisted.get("total") == playlists_page["total"]
+            and persisted.get("signature") == signature
+        ):
+            cls._playlists_total = playlists_page["total"]
+            cls._playlists_signature = signature
+            logger.debug(f"Loaded {len(cache)} playlists from persisted cache.")
+        else:
+            logger.debug(
+                f"Persisted cache of {len(cache)} playlists is outdated, "
+                "refreshing it in the background..."
+            )
+            cls._refresh_thread = threading.Thread(
+                target=cls.refresh_playlists_cache,
+                name="PlaylistsCacheThread",
+                daemon=True,
+            )
+            cls._refresh_thread.start()
+        return True
+
+    @classmethod
+    def save_playlists_cache(cls) -> None:
+        """Persist the directory with the listing total and first page signature."""
+        with cls._playlists_lock:
+            if cls._playlists_cache is None:
+                return
+            persisted = {
+                "total": cls._playlists_total,
+                "signature": cls._playlists_signature,
+                "playlists": cls._playlists_cache,
+            }
+            try:
+                tmp_path = f"{PLAYLISTS_CACHE_PATH}.tmp"
+                with open(tmp_path, "w") as cache_file:
+                    json.dump(persisted, cache_file)
+                os.replace(tmp_path, PLAYLISTS_CACHE_PATH)
+            except Exception as e:
+                logger.warning(f"Failed to persist playlists cache: {e}")
 
     @classmethod
     def refresh_playlists_cache(cls) -> None:
@@ -139,17 +283,205 @@ class SpotifyClient:
         spotify_ins = cls.get_instance()
         cache = {}
         try:
-            playlists = spotify_ins.current_user_playlists()
+            playlists = spotify_ins.current_user_playlists(limit=50)
+            total = playlists["total"]
+            signature = cls._first_page_signature(playlists)
             while playlists:
                 for playlist in playlists["items"]:
-                    if playlist["owner"]["id"] == username:
+                    if playlist and playlist["owner"]["id"] == username:
                         cache[playlist["name"]] = playlist["id"]
+                        # Listing already carries the description, keep it for later
+                        PlaylistDescriptionWriter.remember(
+                            playlist["id"], playlist.get("description")
+                        )
                 playlists = spotify_ins.next(playlists) if playlists["next"] else None
-            cls._playlists_cache = cache
+            with cls._playlists_lock:
+                # Keep playlists created while the refresh was running
+                for name, playlist_id in cls._added_playlists.items():
+                    cache.setdefault(name, playlist_id)
+                cls._playlists_cache = cache
+                cls._playlists_total = total
+                cls._playlists_signature = signature
+                cls._playlists_refreshed = True
             logger.debug(f"Cache refreshed with {len(cache)} playlists.")
+            cls.save_playlists_cache()
         except Exception as e:
             logger.warning(f"Failed to refresh playlists cache: {e}")
-            cls._playlists_cache = cache if cache else None
+            if cls._playlists_cache is None:
+                cls._playlists_cache = cache if cache else None
+
+
+class PlaylistDescriptionWriter:
+    """Defer playlist description updates and write them once per playlist.
+
+    Syncing a playlist only records that its "Updated on" date must be refreshed.
+    The actual GET / PUT happens once per playlist in `flush`, at the end of the run.
+    """
+
+    _pending: ClassVar[dict[str, str]] = {}
+    _descriptions: ClassVar[dict[str, str]] = {}
+
+    @classmethod
+    def remember(cls, playlist_id: str, description: str | None) -> None:
+        """Cache a known description to avoid fetching it again at flush time."""
+        if description is not None:
+            cls._descriptions[playlist_id] = description
+
+    @classmethod
+    def mark_updated(cls, playlist: dict) -> None:
+        """Record that the playlist description must be refreshed with today's date."""
+        cls._pending[playlist["id"]] = playlist.get("name", playlist["id"])
+
+    @classmethod
+    def flush(cls) -> None:
+        """Write the pending descriptions, one request per playlist."""
+        if not cls._pending:
+            return
+
+        logger.info(f"[+] Updating description of {len(cls._pending)} playlists")
+        spotify_ins = spotify_auth()
+        for playlist_id, playlist_name in cls._pending.items():
+            try:
+                current_description = cls._descriptions.get(playlist_id)
+                if current_description is None:
+                    playlist_info = spotify_ins.playlist(
+                        playlist_id, fields="description"
+                    )
+                    current_description = playlist_info.get("description") or ""
+                new_description = description_with_date(current_description)
+                if new_description != current_description:
+                    spotify_ins.playlist_change_details(
+                        playlist_id=playlist_id, description=new_description
+                    )
+                cls._descriptions[playlist_id] = new_description
+            except Exception as e:
+                logger.warning(
+                    f"Failed to update description of playlist {playlist_name}: {e}"
+                )
+        cls._pending.clear()
+
+
+class SingleFlight:
+    """Share one call, and its result, between the threads making it at once.
+
+    The first thread calling with a key runs the function, the threads calling
+    with the same key meanwhile wait for its result instead of calling again.
+    """
+
+    def __init__(self) -> None:
+        """Create a group of calls with no call in flight."""
+        self._lock = threading.Lock()
+        self._calls: dict[str, Future] = {}
+        self.n_shared = 0
+
+    def do(self, key: str, function: Callable[[], Any]) -> Any:
+        """Call function, or wait for the result of the call in flight for key.
+
+        Args:
+            key (str): Key identifying identical calls.
+            function (Callable): Function to call, without arguments.
+
+        Returns:
+            Any: Result of the function, or the exception it raised is raised.
+        """
+        with self._lock:
+            in_flight = self._calls.get(key)
+            if in_flight is None:
+                future: Future = Future()
+                self._calls[key] = future
+            else:
+                self.n_shared += 1
+        if in_flight is not None:
+            return in_flight.result()
+
+        try:
+            result = function()
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            with self._lock:
+                del self._calls[key]
+
+
+class SearchMemo:
+    """Per-run memo of Spotify search query -> results, with call statistics.
+
+    Only the fields listed in TRACKS_DICT_NAMES are kept for each result item.
+    """
+
+    max_size: ClassVar[int] = 20000
+    _results: ClassVar[dict[str, dict]] = {}
+    n_calls: ClassVar[int] = 0
+    n_memo_hits: ClassVar[int] = 0
+    n_plan_duplicates: ClassVar[int] = 0
+    in_flight: ClassVar[SingleFlight] = SingleFlight()
+    # Results are stored from the concurrent search threads
+    _lock: ClassVar[threading.Lock] = threading.Lock()
+
+    @classmethod
+    def get(cls, query: str) -> dict | None:
+        """Get the memoized results of a query, None if it was never sent."""
+        result = cls._results.get(query)
+        if result is not None:
+            cls.n_memo_hits += 1
+        return result
+
+    @classmethod
+    def store(cls, query: str, result: dict) -> dict:
+        """Memoize the results of a query and return the memoized version."""
+        items = [
+            {key: item[key] for key in TRACKS_DICT_NAMES if key in item}
+            for item in result.get("tracks", {}).get("items", [])
+            if item
+        ]
+        memoized_result = {"tracks": {"items": items}}
+        with cls._lock:
+            if len(cls._results) >= cls.max_size:
+                # Drop the oldest query, dicts keep insertion order
+                cls._results.pop(next(iter(cls._results)), None)
+            cls._results[query] = memoized_result
+        TrackIndex.add_tracks(items)
+        return memoized_result
+
+    @classmethod
+    def record_plan_duplicates(cls, n_duplicates: int) -> None:
+        """Count identical queries dropped from a search plan before being sent."""
+        cls.n_plan_duplicates += n_duplicates
+
+    @classmethod
+    def log_stats(cls) -> None:
+        """Log the number of searches sent and saved during the run."""
+        n_shared = cls.in_flight.n_shared
+        n_saved = cls.n_memo_hits + cls.n_plan_duplicates + n_shared
+        n_total = cls.n_calls + n_saved
+        logger.info(
+            f"[+] Spotify searches: {cls.n_calls:,} sent, {n_saved:,} saved "
+            f"({cls.n_memo_hits:,} memoized, {cls.n_plan_duplicates:,} duplicated "
+            f"in search plans, {n_shared:,} shared while in flight), "
+            f"{n_saved / n_total if n_total else 0:.1%} of queries"
+        )
+
+
+class SearchRateLimiter:
+    """Spacing of the Spotify searches, shared by all the threads searching."""
+
+    min_interval: ClassVar[float] = 1 / spotify_searches_per_second
+    _next_time: ClassVar[float] = 0.0
+    _lock: ClassVar[threading.Lock] = threading.Lock()
+
+    @classmethod
+    def wait(cls) -> None:
+        """Wait for the next search slot."""
+        with cls._lock:
+            now = time.monotonic()
+            wait_time = cls._next_time - now
+            cls._next_time = max(now, cls._next_time) + cls.min_interval
+        if wait_time > 0:
+            time.sleep(wait_time)
 
 
 def spotify_auth(verbose_aut: bool = False) -> spotipy.Spotify:
@@ -249,6 +581,8 @@ def create_playlist(playlist_name: str) -> str:
     playlist = spotify_ins.user_playlist_create(
         username, playlist_name, description=playlist_description
     )
+    PlaylistDescriptionWriter.remember(playlist["id"], playlist_description)
+    SpotifyClient.add_playlist(playlist_name, playlist["id"])
     return playlist["id"]
 
 
@@ -267,7 +601,11 @@ def get_playlist_id(playlist_name: str) -> str | None:
     if playlist_id:
         return playlist_id
 
-    # If not found, it might be new, try a targeted search once
+    # The directory is kept up to date on creation, a miss means it does not exist
+    if SpotifyClient.is_playlists_cache_complete():
+        return None
+
+    # No full directory available, e.g. renamed playlist, try a targeted search once
     spotify_ins = SpotifyClient.get_instance()
     logger.debug(
         f"Playlist '{playlist_name}' not in cache, double-checking with search..."
@@ -282,8 +620,7 @@ def get_playlist_id(playlist_name: str) -> str | None:
                     playlist["name"] == playlist_name
                 ):
                     # Found it, update cache and return
-                    if SpotifyClient._playlists_cache is not None:
-                        SpotifyClient._playlists_cache[playlist_name] = playlist["id"]
+                    SpotifyClient.add_playlist(playlist_name, playlist["id"])
                     return playlist["id"]
     except Exception as e:
         logger.debug(f"Search double-check failed for '{playlist_name}': {e}")
@@ -316,7 +653,7 @@ def do_durations_match(
     silent: bool = silent_search,
     debug_duration: bool = False,
 ) -> bool:
-    """Check if durations match.
+    """Check if durations match, within `duration_tolerance_ms`.
 
     Args:
         source_track_duration (int): Duration of the source track.
@@ -328,7 +665,10 @@ def do_durations_match(
         bool: True if durations match, False otherwise.
 
     """
-    if source_track_duration == found_track_duration:
+    if (
+        found_track_duration is not None
+        and abs(source_track_duration - found_track_duration) <= duration_tolerance_ms
+    ):
         if not silent:
             logger.info("\t\t\t\t[+] Durations match")
         return True
@@ -358,114 +698,236 @@ def most_popular_track(tracks: list) -> str | None:
     return winner
 
 
-def tracks_similarity(
+def duration_window(source_duration: int, found_tracks: list[dict]) -> np.ndarray:
+    """Flag the found tracks whose duration is close to the source one.
+
+    Durations match within `duration_tolerance_ms`. Edits, shorter than the
+    extended versions sold on Beatport, match when their name contains "edit" and
+    they last a share of the source duration within EDIT_DURATION_RATIOS. Tracks
+    without a duration are kept in the window.
+
+    Args:
+        source_duration (int): Duration of the source track, in ms.
+        found_tracks (list): List of found tracks.
+
+    Returns:
+        np.ndarray: Boolean mask of the found tracks in the window.
+
+    """
+    durations = np.array(
+        [track.get("duration_ms") or 0 for track in found_tracks], dtype=np.int64
+    )
+    if not source_duration:
+        return np.ones(len(found_tracks), dtype=bool)
+    in_window = (durations == 0) | (
+        np.abs(durations - source_duration) <= duration_tolerance_ms
+    )
+    ratios = durations / source_duration
+    maybe_edits = (
+        ~in_window
+        & (ratios >= EDIT_DURATION_RATIOS[0])
+        & (ratios <= EDIT_DURATION_RATIOS[1])
+    )
+    for i_track in np.flatnonzero(maybe_edits):
+        in_window[i_track] = bool(EDIT_PATTERN.search(found_tracks[i_track]["name"]))
+    return in_window
+
+
+def format_track_detail(track: dict) -> str:
+    """Format a Spotify track as "Name by Artist, Artist", from search result data."""
+    artists_str = ", ".join(artist["name"] for artist in track["artists"])
+    return f"{track['name']} by {artists_str}"
+
+
+def find_exact_match(
+    source_track: BeatportTrack,
+    found_tracks: list[dict],
+    source_name: str | None = None,
+) -> int:
+    """Find a found track with the same name, an artist and the duration of the source.
+
+    Names and artists are compared case insensitively, durations within
+    `duration_tolerance_ms`. Such a track is accepted without scoring the others.
+
+    Args:
+        source_track (BeatportTrack): Source track.
+        found_tracks (list): List of found tracks.
+        source_name (str, optional): Name and mix to compare instead of the source
+            track ones.
+
+    Returns:
+        int: Index of the first exact match, -1 if none.
+
+    """
+    if source_name is None:
+        source_name = source_track.full_name
+    source_name = source_name.casefold()
+    source_artists = {artist.casefold() for artist in source_track.artists}
+    for i_track, track in enumerate(found_tracks):
+        if (
+            track["name"].casefold() == source_name
+            and track.get("duration_ms")
+            and abs(track["duration_ms"] - source_track.duration_ms)
+            <= duration_tolerance_ms
+            and any(
+                artist["name"].casefold() in source_artists for artist in track["artists"]
+            )
+        ):
+            return i_track
+    return -1
+
+
+def _char_masks(text: str) -> dict[str, int]:
+    """Bit mask of the positions of each character of a text."""
+    masks: dict[str, int] = {}
+    for i_char, char in enumerate(text):
+        masks[char] = masks.get(char, 0) | 1 << i_char
+    return masks
+
+
+def lcs_ratio(text_masks: dict[str, int], text_len: int, other: str) -> float:
+    """Similarity ratio 2 * LCS / total length, computed with a bit-parallel LCS.
+
+    Same scale as `similar`, the masks of the text are computed once with
+    `_char_masks` and reused for every comparison.
+
+    Args:
+        text_masks (dict): Character masks of the first string.
+        text_len (int): Length of the first string.
+        other (str): The second string.
+
+    Returns:
+        float: A similarity ratio between 0 and 1.
+
+    """
+    if not text_len or not other:
+        return 1.0 if text_len == len(other) else 0.0
+    full_mask = (1 << text_len) - 1
+    v = full_mask
+    for char in other:
+        u = v & text_masks.get(char, 0)
+        v = ((v + u) | (v - u)) & full_mask
+    n_common = text_len - v.bit_count()
+    return 2 * n_common / (text_len + len(other))
+
+
+def score_tracks(
     source_track: BeatportTrack,
     found_tracks: list[dict],
     debug_comp: bool = False,
-) -> list:
-    """Compute similarity between tracks.
+    source_name: str | None = None,
+    skip_mismatched_durations: bool = True,
+) -> tuple[np.ndarray, int]:
+    """Score all found tracks against a source track in one pass.
+
+    The score is the product of the best artist similarity, the name and mix
+    similarity and the duration score: DURATION_MISMATCH_PENALTY outside the
+    `duration_window`, 1 inside. Tracks outside the window can not score more
+    than the penalty, so they are skipped, with a score of 0, when a track inside
+    it scores as much. Ties go to the track with the closest duration. Source
+    strings are normalized once.
 
     Args:
-        source_track (dict): Source track.
+        source_track (BeatportTrack): Source track.
         found_tracks (list): List of found tracks.
         debug_comp (bool): Whether to enable debug logging.
+        source_name (str, optional): Name and mix to compare instead of the source
+            track ones, for a parsed variant.
+        skip_mismatched_durations (bool): Whether to skip the tracks outside the
+            duration window when possible, only the best score is then exact.
 
     Returns:
-        list: List of similarity scores.
+        tuple: Array of similarity scores, index of the best one (-1 if no track).
 
     """
-    artist_similar = []
-    track_n_similar = []
-    duration_similar = []
-
-    for track in found_tracks:
-        # artist_r = track.artists[0][
-        #     "name"
-        # ]  # ", ".join([artist["name"] for artist in track.artists])
-        artist_match = []
-        for artist_s in source_track.artists:  # ", ".join(source_track.artists)
-            for artist_r in track["artists"]:
-                artist_match.append(similar(artist_s.lower(), artist_r["name"].lower()))
-                if debug_comp:
-                    logger.info(
-                        "\t\t\t[+] {} vs {}: {}".format(
-                            artist_s, artist_r["name"], artist_match[-1]
-                        )
-                    )
-        sim_artists = max(artist_match)
+    if not found_tracks:
+        return np.zeros(0), -1
 
-        artist_similar.append(sim_artists)
-
-        track_n_s = source_track.name + (
-            "" if not source_track.mix else f" - {source_track.mix}"
+    source_artists = [
+        (_char_masks(artist), len(artist)) for artist in source_track.norm_artists
+    ]
+    if source_name is None:
+        source_name = source_track.full_name
+    source_name_masks = _char_masks(source_name)
+
+    def similarity(track: dict) -> float:
+        artist_score = max(
+            (
+                lcs_ratio(masks, artist_len, artist["name"].lower())
+                for masks, artist_len in source_artists
+                for artist in track["artists"]
+            ),
+            default=0.0,
         )
-        track_n_r = track["name"]
-        sim_name = similar(track_n_s, track_n_r)
+        name_score = lcs_ratio(source_name_masks, len(source_name), track["name"])
         if debug_comp:
             logger.info(
-                f"\t\t\t[+] {track_n_s.lower()} vs {track_n_r.lower()}: {sim_name}"
+                f"\t\t\t[+] {source_name} vs {track['name']}: "
+                f"artists {artist_score}, name {name_score}"
             )
-        track_n_similar.append(sim_name)
+        return artist_score * name_score
 
-        duration_s = source_track.duration_ms
-        duration_r = track["duration_ms"]
-        try:
-            sim_duration = duration_r / duration_s
-        except Exception as e:
-            logger.warning(f"track {source_track!s} has duration error {e}")
-        sim_duration = 1  # TODO: remove this
-        # if debug_comp:
-        #     logger.info(
-        #         "\t\t\t[+] {} vs {}: {}".format(duration_s, duration_r, sim_duration)
-        #     )
-        duration_similar.append(sim_duration)
-        if debug_comp:
-            logger.info("-")
-
-        tracks_sim = [
-            a * n * d
-            for a, n, d in zip(artist_similar, track_n_similar, duration_similar)
-        ]
-
-    return tracks_sim
+    # Tracks are compared from the closest duration
+    durations = np.array(
+        [track.get("duration_ms") or 0 for track in found_tracks], dtype=np.int64
+    )
+    by_duration = np.argsort(np.abs(durations - source_track.duration_ms), kind="stable")
+    # Tracks outside the duration window score at most the penalty, only compare
+    # them when no track of the window scores as much
+    in_window = duration_window(source_track.duration_ms, found_tracks)
+    scores = np.zeros(len(found_tracks))
+    for i_track in by_duration[in_window[by_duration]]:
+        scores[i_track] = similarity(found_tracks[i_track])
+    if not skip_mismatched_durations or scores.max() < DURATION_MISMATCH_PENALTY:
+        for i_track in by_duration[~in_window[by_duration]]:
+            scores[i_track] = (
+                similarity(found_tracks[i_track]) * DURATION_MISMATCH_PENALTY
+            )
+    return scores, int(by_duration[np.argmax(scores[by_duration])])
 
 
-def _get_duration_matches(
+def tracks_similarity(
     source_track: BeatportTrack,
     found_tracks: list[dict],
-    silent: bool,
-    debug_duration: bool,
-) -> list[dict]:
-    duration_matches = []
-    for track in found_tracks:
-        if do_durations_match(
-            source_track.duration_ms,
-            track["duration_ms"],
-            silent=silent,
-            debug_duration=debug_duration,
-        ):
-            duration_matches.append(track)
-    return duration_matches
+    debug_comp: bool = False,
+    source_name: str | None = None,
+    skip_mismatched_durations: bool = True,
+) -> list:
+    """Compute similarity between tracks.
+
+    Args:
+        source_track (dict): Source track.
+        found_tracks (list): List of found tracks.
+        debug_comp (bool): Whether to enable debug logging.
+        source_name (str, optional): Name and mix to compare instead of the source
+            track ones.
+        skip_mismatched_durations (bool): Whether to skip, with a score of 0, the
+            tracks outside the duration window that can not be the best match.
+
+    Returns:
+        list: List of similarity scores.
+
+    """
+    scores, _ = score_tracks(
+        source_track, found_tracks, debug_comp, source_name, skip_mismatched_durations
+    )
+    return scores.tolist()
 
 
 def _get_best_similarity_match(
-    source_track: BeatportTrack,
     found_tracks: list[dict],
+    tracks_sim: np.ndarray,
+    best_index: int,
     silent: bool,
     match_threshold: float,
-    debug_comp: bool,
 ) -> str | None:
-    tracks_sim = tracks_similarity(source_track, found_tracks, debug_comp)
-    tracks_sim_a = np.array(tracks_sim)
-    if any(tracks_sim_a >= match_threshold):
-        max_value = max(tracks_sim)
-        max_index = tracks_sim.index(max_value)
-        best_sim_id = found_tracks[max_index]["id"]
+    if tracks_sim[best_index] >= match_threshold:
+        best_sim_id = found_tracks[best_index]["id"]
         if not silent:
             logger.info(
                 "\t\t\t[+] Multiple matches with more than 85%:"
-                f" {sum(tracks_sim_a >= match_threshold)}, "
-                f"max:{max_value}, ID: {best_sim_id}"
+                f" {sum(tracks_sim >= match_threshold)}, "
+                f"max:{tracks_sim[best_index]}, ID: {best_sim_id}"
             )
         return best_sim_id
     else:
@@ -478,6 +940,7 @@ def best_of_multiple_matches(
     source_track: BeatportTrack,
     found_tracks: list[dict],
     silent: bool = silent_search,
+    source_name: str | None = None,
 ) -> str | None:
     """Find the best match among multiple tracks.
 
@@ -485,6 +948,8 @@ def best_of_multiple_matches(
         source_track (dict): Source track.
         found_tracks (list): List of found tracks.
         silent (bool): Whether to suppress logging output.
+        source_name (str, optional): Name and mix to compare instead of the source
+            track ones.
 
     Returns:
         str: ID of the best match.
@@ -495,14 +960,35 @@ def best_of_multiple_matches(
     debug_duration = False
     debug_comp = False  # Will show the comparison score between the tracks
 
-    duration_matches = _get_duration_matches(
-        source_track, found_tracks, silent, debug_duration
+    exact_index = find_exact_match(source_track, found_tracks, source_name)
+    if exact_index >= 0:
+        if not silent:
+            logger.info(
+                "\t\t\t[+] Exact match on name, artist and duration: "
+                f"{found_tracks[exact_index]['id']}"
+            )
+        return found_tracks[exact_index]["id"]
+
+    # Score all the tracks once, for both the duration and similarity checks
+    tracks_sim, best_index = score_tracks(
+        source_track, found_tracks, debug_comp, source_name
     )
 
+    duration_matches = [
+        i_track
+        for i_track, track in enumerate(found_tracks)
+        if do_durations_match(
+            source_track.duration_ms,
+            track["duration_ms"],
+            silent=silent,
+            debug_duration=debug_duration,
+        )
+    ]
+
     if len(duration_matches) == 1:
-        best_track = duration_matches[0]
-        tracks_sim = tracks_similarity(source_track, [best_track])
-        if tracks_sim[0] >= match_threshold:
+        best_track = found_tracks[duration_matches[0]]
+        track_sim = tracks_sim[duration_matches[0]]
+        if track_sim >= match_threshold:
             if not silent:
                 logger.info(
                     "\t\t\t[+] Only one exact match with matching duration, "
@@ -513,12 +999,12 @@ def best_of_multiple_matches(
             if not silent:
                 logger.info(
                     "\t\t\t[+] Only one exact match with matching duration, "
-                    f"but similarity is too low {tracks_sim[0]}:"
-                    f" {get_track_detail(best_track['id'])}"
+                    f"but similarity is too low {track_sim}:"
+                    f" {format_track_detail(best_track)}"
                 )
     # TODO: Popularity does not always yield the correct result
     best_sim_id = _get_best_similarity_match(
-        source_track, found_tracks, silent, match_threshold, debug_comp
+        found_tracks, tracks_sim, best_index, silent, match_threshold
     )
     if best_sim_id:
         return best_sim_id
@@ -534,12 +1020,20 @@ def best_of_multiple_matches(
     return best_track_id
 
 
-def search_wrapper(query: str, logger: logging.Logger = logger) -> dict:
+def search_wrapper(
+    query: str, logger: logging.Logger = logger, limit: int = 10, offset: int = 0
+) -> dict:
     """Search for a track on Spotify.
 
+    Results are memoized for the run, see `SearchMemo`. Queries are compared
+    ignoring case and extra spaces, as Spotify does, and threads sending the same
+    query at the same time share a single search.
+
     Args:
         query (str): Search query.
         logger (logging.Logger): Logger instance.
+        limit (int): Maximum number of results, up to 50.
+        offset (int): Index of the first result, to page through results.
 
     Returns:
         dict: Search results.
@@ -548,22 +1042,43 @@ def search_wrapper(query: str, logger: logging.Logger = logger) -> dict:
     if len(query) > 250:
         logger.debug(f"Skipping search — query exceeds 250 chars: {query[:80]}...")
         return {"tracks": {"items": []}}
+    normalized_query = " ".join(query.casefold().split())
+    memo_key = (
+        normalized_query
+        if (limit, offset) == (10, 0)
+        else f"{normalized_query}|{limit}|{offset}"
+    )
+    memoized_result = SearchMemo.get(memo_key)
+    if memoized_result is not None:
+        return memoized_result
+    return SearchMemo.in_flight.do(
+        memo_key, partial(_send_search, query, memo_key, limit, offset, logger)
+    )
+
+
+def _send_search(
+    query: str, memo_key: str, limit: int, offset: int, logger: logging.Logger
+) -> dict:
+    # The same query may have been searched since the memo was checked
+    memoized_result = SearchMemo.get(memo_key)
+    if memoized_result is not None:
+        return memoized_result
     spotify_ins = spotify_auth()
-    logger.setLevel(logging.FATAL)
     result: dict = {"tracks": {"items": []}}
     try:
-        result = spotify_ins.search(query)
+        SearchRateLimiter.wait()
+        SearchMemo.n_calls += 1
+        result = SearchMemo.store(
+            memo_key, spotify_ins.search(query, limit=limit, offset=offset)
+        )
     except SpotifyException as e:
-        logger.setLevel(logging.INFO)
         if e.http_status == 404 or (e.http_status == 400 and e.code == -1):
             # Return empty result
             return {"tracks": {"items": []}}
         else:
             pass
     except Exception as e:
-        logger.setLevel(logging.INFO)
         logger.warning(f"NEW exception: {e!s}")
-    logger.setLevel(logging.INFO)
     return result
 
 
@@ -702,7 +1217,10 @@ def search_for_track(track: BeatportTrack, silent: bool = silent_search) -> str
 
 
 def parse_search_results_spotify(
-    search_results: dict, track: BeatportTrack, silent: bool = silent_search
+    search_results: dict,
+    track: BeatportTrack,
+    silent: bool = silent_search,
+    source_name: str | None = None,
 ) -> str | None:
     """Parse Spotify search results.
 
@@ -710,6 +1228,8 @@ def parse_search_results_spotify(
         search_results (dict): Spotify API search results.
         track (dict): Track to search for.
         silent (bool): Whether to suppress logging output.
+        source_name (str, optional): Name and mix searched, if a parsed variant of
+            the track ones.
 
     Returns:
         str: Track ID if found, otherwise None.
@@ -719,22 +1239,23 @@ def parse_search_results_spotify(
 
     if len(search_results["tracks"]["items"]) == 1:
         best_track = search_results["tracks"]["items"][0]
-        tracks_sim = tracks_similarity(track, [best_track])
+        if find_exact_match(track, [best_track], source_name) == 0:
+            tracks_sim = [1.0]
+        else:
+            tracks_sim = tracks_similarity(track, [best_track], source_name=source_name)
         if tracks_sim[0] > 0.9:
             if not silent:
                 logger.info(
-                    "\t\t\t[+] Only one exact match from search: {} - {}".format(
-                        get_track_detail(best_track["id"]), best_track["id"]
-                    )
+                    "\t\t\t[+] Only one exact match from search: "
+                    f"{format_track_detail(best_track)} - {best_track['id']}"
                 )
             return best_track["id"]
         else:
             if not silent:
                 logger.info(
                     "\t\t\t[+] Only one exact match with matching duration,"
-                    " but similarity is too low {}: {}".format(
-                        tracks_sim[0], get_track_detail(best_track["id"])
-                    )
+                    f" but similarity is too low {tracks_sim[0]}: "
+                    f"{format_track_detail(best_track)}"
                 )
 
     if len(search_results["tracks"]["items"]) > 1:
@@ -744,155 +1265,13 @@ def parse_search_results_spotify(
                     len(search_results["tracks"]["items"])
                 )
             )
-        return best_of_multiple_matches(track, search_results["tracks"]["items"])
+        return best_of_multiple_matches(
+            track, search_results["tracks"]["items"], silent, source_name
+        )
 
     return track_id
 
 
-def parse_track_regex_beatport(track: BeatportTrack) -> list:
-    """Parse track name and mix using regular expressions.
-
-    Args:
-        track (dict): Track dictionary.
-
-    Returns:
-        list: List of modified track dictionaries.
-
-    """
-    tracks_out = []
-
-    # Method 1
-    track_out = track.model_copy()  # Otherwise modifies the dict
-    track_out.name = re.sub(
-        r"(\s*(Feat|feat|Ft|ft)\. [\w\s]*$)", "", track_out.name
-    )  # Remove feat info, mostly not present in spotify
-    track_out.name = re.sub(
-        r"\W", " ", track_out.name
-    )  # Remove special characters as they are not handled by Spotify API
-
-    tracks_out.append(track_out)
-
-    # Method 2
-    # Remove feat, special char and mixes
-    track_out = track.model_copy()  # Otherwise modifies the dict
-    track_out.name = re.sub(
-        r"(\s*(Feat|feat|Ft|ft)\. [\w\s]*$)", "", track_out.name
-    )  # Remove feat info, mostly not present in spotify
-    # track_out.name = re.sub(
-    #     r"[^\w\s]", "", track_out.name
-    # )  # Remove special characters as they are not handled by Spotify API
-    if re.search("[O|o]riginal [M|m]ix", track_out.mix):
-        # Remove original mix as not used in Spotify
-        # TODO add track duration check in similarity
-        track_out.mix = None
-    if track_out.mix == "Extended Mix":
-        # Remove Extended Mix as not used in Spotify
-        # TODO add track duration check in similarity
-        track_out.mix = None
-
-    tracks_out.append(track_out)
-
-    # Method 3
-    track_out = track.model_copy()  # Otherwise modifies the dict
-    track_out.name = re.sub(
-        r"(\s*(Feat|feat|Ft|ft)\. [\w\s]*$)", "", track_out.name
-    )  # Remove feat info, mostly not present in spotify
-    track_out.name = re.sub(
-        r"[^\w\s]", "", track_out.name
-    )  # Remove special characters as they are not handled by Spotify API
-
-    tracks_out.append(track_out)
-
-    # Method 4
-    track_out = track.model_copy()  # Otherwise modifies the dict
-    track_out.name = re.sub(
-        r"(\s*(Feat|feat|Ft|ft)\. [\w\s]*$)", "", track_out.name
-    )  # Remove feat info, mostly not present in spotify
-    track_out.name = re.sub(
-        r"[^\w\s]", "", track_out.name
-    )  # Remove special characters as they are not handled by Spotify API
-    track_out.mix = re.sub("[R|r]emix", "mix", track_out.mix)  # Change remix
-    track_out.mix = re.sub("[M|m]ix", "Remix", track_out.mix)  # Change to remix
-
-    tracks_out.append(track_out)
-
-    # Method 5
-    track_out = track.model_copy()  # Otherwise modifies the dict
-    track_out.name = re.sub(
-        r"(\s*(Feat|feat|Ft|ft)\. [\w\s]*$)", "", track_out.name
-    )  # Remove feat info, mostly not present in spotify
-    track_out.name = re.sub(
-        r"[^\w\s]", "", track_out.name
-    )  # Remove special characters as they are not handled by Spotify API
-    track_out.mix = re.sub(
-        "[M|m]ix", "", track_out.mix
-    )  # Remove special characters as they are not handled by Spotify API
-
-    tracks_out.append(track_out)
-
-    # Method 6
-    # Remove feat, special char and replace mixes with radio edit
-    # as often exists on Spotify only
-    track_out = track.model_copy()  # Otherwise modifies the dict
-    track_out.name = re.sub(
-        r"(\s*(Feat|feat|Ft|ft)\. [\w\s]*$)", "", track_out.name
-    )  # Remove feat info, mostly not present in spotify
-    # track_out.name = re.sub(
-    #     r"[^\w\s]", "", track_out.name
-    # )  # Remove special characters as they are not handled by Spotify API
-    if re.search("[O|o]riginal [M|m]ix", track_out.mix):
-        # Remove original mix as not used in Spotify
-        # TODO add track duration check in similarity
-        track_out.mix = "Radio Edit"
-    if track_out.mix == "Extended Mix":
-        # Remove Extended Mix as not used in Spotify
-        # TODO add track duration check in similarity
-        track_out.mix = "Radio Edit"
-
-    # Method 7
-    # Remove feat, special char and replace mixes with radio edit
-    # as often exists on Spotify only
-    track_out = track.model_copy()  # Otherwise modifies the dict
-    track_out.name = re.sub(
-        r"(\s*(Feat|feat|Ft|ft)\. [\w\s]*$)", "", track_out.name
-    )  # Remove feat info, mostly not present in spotify
-    track_out.mix = "Edit"
-    tracks_out.append(track_out)
-
-    # Method 8
-    # Remove feat, special char and replace mixes with radio edit
-    # as often exists on Spotify only
-    track_out = track.model_copy()  # Otherwise modifies the dict
-    track_out.name = re.sub(
-        r"(\s*(Feat|feat|Ft|ft)\. [\w\s]*$)", "", track_out.name
-    )  # Remove feat info, mostly not present in spotify
-    track_out.mix = "Radio-Edit"
-    tracks_out.append(track_out)
-
-    # Method 9
-    # Remove feat, special char and replace mixes with radio edit
-    # as often exists on Spotify only
-    track_out = track.model_copy()  # Otherwise modifies the dict
-    track_out.name = clean_track_name(track_out.name)
-    track_out.mix = ""
-    # tracks_out.append(track_out)
-
-    return tracks_out
-
-
-def add_space(match: re.Match) -> str:
-    """Add a space before the matched string.
-
-    Args:
-        match (re.Match): The matched string.
-
-    Returns:
-        str: The modified string with a space added.
-
-    """
-    return " " + match.group()
-
-
 def query_track_album_label(
     track_name: str, artist: str, track_: BeatportTrack, silent: bool = silent_search
 ) -> str:
@@ -998,12 +1377,28 @@ def track_in_playlist(playlist_id: str, track_id: str) -> bool:
     Returns:
         bool: True if track is in playlist, otherwise False.
 
+    """
+    return track_id in get_playlist_track_ids(playlist_id)
+
+
+def get_playlist_track_ids(playlist_id: str) -> set[str]:
+    """Get the IDs of all tracks in a playlist with a single scan.
+
+    Use it rather than `track_in_playlist` when checking several tracks.
+
+    Args:
+        playlist_id (str): Playlist ID.
+
+    Returns:
+        set[str]: IDs of the tracks in the playlist.
+
     """
     fields = "items(track(id)),next"
-    for track in get_all_tracks_in_playlist(playlist_id, fields=fields):
-        if track.get("track") and track["track"].get("id") == track_id:
-            return True
-    return False
+    return {
+        item["track"]["id"]
+        for item in get_all_tracks_in_playlist(playlist_id, fields=fields)
+        if item.get("track") and item["track"].get("id")
+    }
 
 
 def add_tracks_to_playlist(playlist_id: str, track_ids: list) -> None:
@@ -1026,6 +1421,24 @@ def add_tracks_to_playlist(playlist_id: str, track_ids: list) -> None:
         )
 
 
+def replace_playlist_tracks(playlist_id: str, track_ids: list) -> None:
+    """Replace all tracks of a playlist, keeping the given order.
+
+    Not atomic, the tracks after a failed request are missing from the playlist:
+    only use it for playlists rebuilt from scratch on every run.
+
+    Args:
+        playlist_id (str): Playlist ID.
+        track_ids (list): List of track IDs or URIs, an empty list clears it.
+    """
+    spotify_ins = spotify_auth()
+    # Replace accepts at most 100 items, the rest is appended in chunks of 100
+    spotify_ins.playlist_replace_items(playlist_id, track_ids[:100])
+    for i in range(100, len(track_ids), 100):
+        chunk = track_ids[i : i + 100]
+        spotify_ins.playlist_add_items(playlist_id=playlist_id, items=chunk)
+
+
 def get_all_tracks_in_playlist(playlist_id: str, fields: str | None = None) -> list:
     """Get all tracks in a playlist.
 
@@ -1050,6 +1463,125 @@ def get_all_tracks_in_playlist(playlist_id: str, fields: str | None = None) -> l
     return playlist_tracks
 
 
+def get_album_tracks(release: str, label: str) -> list[dict]:
+    """Find the Spotify album of a Beatport release and get its full tracklist.
+
+    Args:
+        release (str): Beatport release name.
+        label (str): Beatport label name.
+
+    Returns:
+        list: Tracks of the album, empty if no album has a similar name.
+
+    """
+    try:
+        album_tracks = _fetch_album_tracks(release, label)
+    except Exception as e:
+        logger.warning(f"Failed to get album tracks of {release} on {label}: {e}")
+        return []
+    # Copies, so that callers cannot alter the cached tracklist
+    return [dict(track) for track in album_tracks]
+
+
+@lru_cache(maxsize=1024)
+def _fetch_album_tracks(release: str, label: str) -> tuple[dict, ...]:
+    """Album tracklist of get_album_tracks, errors raise so that they are not cached."""
+    # Only one diff in letter case is only 85% similarity
+    match_threshold = 0.85
+    spotify_ins = spotify_auth()
+    SearchRateLimiter.wait()
+    SearchMemo.n_calls += 1
+    albums = spotify_ins.search(
+        f'album:"{release}" label:"{label}"', type="album", limit=10
+    )["albums"]["items"]
+    albums_sim = [similar(album["name"].lower(), release.lower()) for album in albums]
+    if not albums_sim or max(albums_sim) < match_threshold:
+        return ()
+    album = albums[albums_sim.index(max(albums_sim))]
+
+    SearchRateLimiter.wait()
+    SearchMemo.n_calls += 1
+    album_tracks_pager = spotify_ins.album_tracks(album["id"], limit=50)
+    album_tracks = album_tracks_pager["items"]
+    while album_tracks_pager.get("next"):
+        SearchRateLimiter.wait()
+        SearchMemo.n_calls += 1
+        album_tracks_pager = spotify_ins.next(album_tracks_pager)
+        if album_tracks_pager is None:
+            break
+        album_tracks.extend(album_tracks_pager["items"])
+    TrackIndex.add_tracks(album_tracks)
+    return tuple(
+        {key: track[key] for key in TRACKS_DICT_NAMES if key in track}
+        for track in album_tracks
+        if track
+    )
+
+
+def get_label_catalog(label: str) -> list[dict]:
+    """Get the tracks of all the Spotify albums released on a label.
+
+    Albums are found by paging `label:` album searches, their tracks are fetched
+    20 albums at a time.
+
+    Args:
+        label (str): Label name.
+
+    Returns:
+        list: Tracks of the label albums, empty if the catalog could not be fetched.
+
+    """
+    try:
+        catalog = _fetch_label_catalog(label)
+    except Exception as e:
+        logger.warning(f"Failed to get the catalog of label {label}: {e}")
+        return []
+    # Copies, so that callers cannot alter the cached catalog
+    return [dict(track) for track in catalog]
+
+
+@lru_cache(maxsize=64)
+def _fetch_label_catalog(label: str) -> tuple[dict, ...]:
+    """Label catalog of get_label_catalog, errors raise so that they are not cached."""
+    # Spotify search results are limited to the first 1000 items
+    max_search_offset = 1000
+    spotify_ins = spotify_auth()
+    catalog = []
+    album_ids: list[str] = []
+    for offset in range(0, max_search_offset, 50):
+        SearchRateLimiter.wait()
+        SearchMemo.n_calls += 1
+        albums_pager = spotify_ins.search(
+            f'label:"{label}"', type="album", limit=50, offset=offset
+        )["albums"]
+        album_ids.extend(album["id"] for album in albums_pager["items"] if album)
+        if not albums_pager.get("next"):
+            break
+
+    for i in range(0, len(album_ids), 20):
+        SearchRateLimiter.wait()
+        SearchMemo.n_calls += 1
+        for album in spotify_ins.albums(album_ids[i : i + 20])["albums"]:
+            if not album:
+                continue
+            album_tracks_pager = album["tracks"]
+            catalog.extend(album_tracks_pager["items"])
+            while album_tracks_pager.get("next"):
+                SearchRateLimiter.wait()
+                SearchMemo.n_calls += 1
+                album_tracks_pager = spotify_ins.next(album_tracks_pager)
+                if album_tracks_pager is None:
+                    break
+                catalog.extend(album_tracks_pager["items"])
+    logger.info(f"[+] Label {label} catalog: {len(catalog):,} Spotify tracks")
+    TrackIndex.add_tracks(catalog)
+    return tuple(
+        {key: track[key] for key in TRACKS_DICT_NAMES if key in track}
+        for track in catalog
+        if track
+    )
+
+
 def clear_playlist(playlist_id: str) -> None:
     """Clear a playlist.
 
@@ -1093,7 +1625,7 @@ def parse_tracks_spotify(tracks_json: dict) -> list[BeatportTrack]:
         list: List of parsed tracks.
 
     """
-    tracks = list()
+    tracks_data = list()
     for track_item in tracks_json["tracks"]["items"]:
         track_data = {
             "title": track_item.get("name"),
@@ -1106,20 +1638,17 @@ def parse_tracks_spotify(tracks_json: dict) -> list[BeatportTrack]:
             "published_date": track_item.get("album", {}).get("release_date", ""),
             "released_date": track_item.get("album", {}).get("release_date", ""),
             "duration_ms": track_item.get("duration_ms", 0),
-            "genres": [],
-            "bpm": 0,
-            "key": "",
         }
 
         duration_ms = track_data["duration_ms"]
         minutes = duration_ms // 60000
         seconds = (duration_ms % 60000) // 1000
         track_data["duration"] = f"{minutes}:{seconds:02d}"
+        tracks_data.append(track_data)
 
-        try:
-            tracks.append(BeatportTrack.model_validate(track_data))
-        except Exception as e:
-            logger.warning(f"Failed to parse Spotify track {track_item.get('name')}: {e}")
+    tracks, invalid_tracks = validate_tracks(tracks_data)
+    for track_data, e in invalid_tracks:
+        logger.warning(f"Failed to parse Spotify track {track_data['name']}: {e}")
     return tracks
 
 
@@ -1346,32 +1875,48 @@ def get_track_detail(track_id: str) -> str:
     return "{} by {}".format(track_result["name"], artists_str)
 
 
-def update_playlist_description_with_date(playlist: dict) -> None:
-    """Update playlist description with current date.
+def description_with_date(current_description: str) -> str:
+    """Replace the "Updated on" date of a playlist description with today's date.
 
     Args:
-        playlist (dict): Playlist dictionary.
-    """
-    spotify_ins = spotify_auth()
-    playlist_info = spotify_ins.playlist(playlist["id"])
+        current_description (str): Current playlist description.
 
-    current_description: str = playlist_info["description"]
+    Returns:
+        str: The description ending with today's date.
+    """
     current_description = re.sub(
         r"\s*Updated on \d{4}-\d{2}-\d{2}\.*", "", current_description
     )
     current_description = re.sub(r"&#x2F;", "/", current_description)
-
-    spotify_ins.playlist_change_details(
-        playlist_id=playlist["id"],
-        description=current_description
-        + " Updated on {}.".format(datetime.today().strftime("%Y-%m-%d")),
+    return current_description + " Updated on {}.".format(
+        datetime.today().strftime("%Y-%m-%d")
     )
 
 
+def update_playlist_description_with_date(playlist: dict) -> None:
+    """Update playlist description with current date.
+
+    The update is deferred, see `flush_playlist_descriptions`.
+
+    Args:
+        playlist (dict): Playlist dictionary.
+    """
+    PlaylistDescriptionWriter.mark_updated(playlist)
+
+
+def flush_playlist_descriptions() -> None:
+    """Write all deferred playlist description updates."""
+    PlaylistDescriptionWriter.flush()
+
+
 def get_playlist_tracks_df(
     playlist_id: str, prefixed_playlist_name: str
 ) -> pd.DataFrame | None:
     """Get all tracks from a playlist and return them as a DataFrame."""
+    # Snapshot the positions are read from, to pin the removals to it
+    snapshot_id = spotify_auth().playlist(playlist_id, fields="snapshot_id")[
+        "snapshot_id"
+    ]
     # Fetch only necessary fields
     fields = "items(added_at,track(id,uri)),next"
     all_tracks = get_all_tracks_in_playlist(playlist_id, fields=fields)
@@ -1405,51 +1950,78 @@ def get_playlist_tracks_df(
     gc.collect()
 
     tracks_df["added_at"] = pd.to_datetime(tracks_df["added_at"])
-    return tracks_df.sort_values("added_at", ascending=True)
+    tracks_df = tracks_df.sort_values("added_at", ascending=True)
+    tracks_df.attrs["snapshot_id"] = snapshot_id
+    return tracks_df
 
 
-def remove_playlist_duplicates(
-    playlist_id: str, tracks_df: pd.DataFrame, prefixed_playlist_name: str
+def _remove_and_readd_duplicates(
+    playlist_id: str, duplicated_uris: list[str], prefixed_playlist_name: str
 ) -> None:
-    """Remove duplicate tracks from a playlist."""
-    duplicated_df = tracks_df[tracks_df.duplicated(subset=["track_id"], keep="last")]
+    """Remove all occurrences of duplicated items and add each of them back once.
 
-    if not duplicated_df.empty:
-        logger.warning(
-            f"Found {len(duplicated_df)} duplicates in playlist "
-            f"'{prefixed_playlist_name}'."
-        )
+    Fallback when Spotify refuses the removal of duplicates by position.
+    """
+    spotify_ins = spotify_auth()
+    for i in range(0, len(duplicated_uris), 100):
+        chunk = duplicated_uris[i : i + 100]
+        try:
+            spotify_ins.playlist_remove_all_occurrences_of_items(playlist_id, chunk)
+            # Add back because Spotify API remove all occurences
+            spotify_ins.playlist_add_items(playlist_id=playlist_id, items=chunk)
+        except Exception as e:
+            logger.error(
+                f"Failed to remove {len(chunk)} duplicated tracks from playlist "
+                f"{prefixed_playlist_name}: {e}"
+            )
 
-        duplicated_df = duplicated_df.sort_values("position", ascending=True)
 
-        items_to_remove = [
-            {"uri": row["uri"], "positions": [row["position"] + 1]}
-            for _, row in duplicated_df.iterrows()
-        ]
+def remove_playlist_duplicates(
+    playlist_id: str, tracks_df: pd.DataFrame, prefixed_playlist_name: str
+) -> None:
+    """Remove duplicate tracks from a playlist.
 
-        spotify_ins = spotify_auth()
-        removed_count = 0
-        for item in items_to_remove:
-            track_name = get_track_detail(item["uri"].split(":")[-1])
-            logger.info(f"Removing duplicate track {track_name}, uri {item['uri']}")
-            try:
-                spotify_ins.playlist_remove_specific_occurrences_of_items(
-                    playlist_id, [item]
-                )
-                # Add back because Spotify API remove all occurences
-                spotify_ins.playlist_add_items(
-                    playlist_id=playlist_id, items=[item["uri"]]
-                )
-                removed_count += 1
-            except Exception as e:
-                logger.error(
-                    f"Failed to remove track {item['uri']} at position "
-                    f"{item['positions'][0]} from playlist "
-                    f"{prefixed_playlist_name}: {e}"
-                )
+    The most recently added occurrence of each track is kept, the others are
+    removed by position, 100 tracks per request. Requests are pinned to the
+    snapshot the positions were read from, so that only the duplicates are removed.
+    """
+    duplicated_df = tracks_df[tracks_df.duplicated(subset=["track_id"], keep="last")]
 
-    else:
+    if duplicated_df.empty:
         logger.info(f"No duplicates found in playlist '{prefixed_playlist_name}'.")
+        return
+
+    logger.warning(
+        f"Found {len(duplicated_df)} duplicates in playlist '{prefixed_playlist_name}'."
+    )
+    positions_by_uri = (
+        duplicated_df.sort_values("position", ascending=True)
+        .groupby("uri", sort=False)["position"]
+        .apply(list)
+    )
+    items_to_remove = [
+        {"uri": uri, "positions": [int(position) for position in positions]}
+        for uri, positions in positions_by_uri.items()
+    ]
+    for item in items_to_remove:
+        logger.debug(f"Removing duplicate track uri {item['uri']}")
+
+    spotify_ins = spotify_auth()
+    snapshot_id = tracks_df.attrs.get("snapshot_id")
+    for i in range(0, len(items_to_remove), 100):
+        chunk = items_to_remove[i : i + 100]
+        try:
+            spotify_ins.playlist_remove_specific_occurrences_of_items(
+                playlist_id, chunk, snapshot_id=snapshot_id
+            )
+        except Exception as e:
+            logger.warning(
+                f"Failed to remove {len(chunk)} duplicated tracks by position from "
+                f"playlist {prefixed_playlist_name}: {e}"
+            )
+            _remove_and_readd_duplicates(
+                playlist_id, [item["uri"] for item in chunk], prefixed_playlist_name
+            )
 
 
 def dedup_playlists(playlist_names: list[str]) -> None:
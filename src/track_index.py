@@ -0,0 +1,286 @@
+"""Local index of the Spotify tracks seen, to match tracks without searches."""
+
+import hashlib
+import logging
+import os
+import re
+import shutil
+import threading
+from typing import ClassVar
+
+import numpy as np
+
+from src.config import folder_path
+from src.configure_logging import configure_logging
+
+configure_logging()
+logger = logging.getLogger("track_index")
+
+TRACK_INDEX_PATH = f"{folder_path}/track_index"
+# Arrays of the index, each saved as a .npy file loadable with memory mapping
+#   ids, durations: Spotify ID and duration of each track
+#   text, text_offsets: UTF-8 "name<US>artist<RS>artist" of each track
+#   token_hashes, postings_offsets, postings: sorted hashes of the name tokens and,
+#   for each, the rows of the tracks containing it
+ARRAY_NAMES = [
+    "ids",
+    "durations",
+    "text",
+    "text_offsets",
+    "token_hashes",
+    "postings_offsets",
+    "postings",
+]
+NAME_SEPARATOR = "\x1f"
+ARTIST_SEPARATOR = "\x1e"
+
+
+def tokenize(text: str) -> set[str]:
+    """Split a text into lowercase word tokens."""
+    return set(re.findall(r"\w+", text.lower()))
+
+
+def token_hash(token: str) -> int:
+    """Stable 64 bits hash of a token."""
+    return int.from_bytes(
+        hashlib.blake2b(token.encode(), digest_size=8).digest(), "little"
+    )
+
+
+class TrackIndex:
+    """Inverted index of the name tokens of every Spotify track seen.
+
+    Tracks are added from search results, album tracklists and label catalogs.
+    The index saved by previous runs is memory mapped, tracks seen during the
+    run are kept in memory until `save`. The index keeps at most `max_tracks`
+    tracks, the tracks saved first are dropped beyond.
+    """
+
+    max_candidates: ClassVar[int] = 20
+    max_tracks: ClassVar[int] = 500_000
+    n_local_matches: ClassVar[int] = 0
+    _arrays: ClassVar[dict[str, np.ndarray] | None] = None
+    _known_ids: ClassVar[set[str] | None] = None
+    _pending: ClassVar[dict[str, tuple[str, tuple[str, ...], int]]] = {}
+    _pending_postings: ClassVar[dict[str, list[str]]] = {}
+    # Tracks are added and searched from the concurrent search threads
+    _lock: ClassVar[threading.Lock] = threading.Lock()
+
+    @classmethod
+    def _load(cls) -> dict[str, np.ndarray]:
+        if cls._arrays is None:
+            try:
+                cls._arrays = {
+                    name: np.load(f"{TRACK_INDEX_PATH}/{name}.npy", mmap_mode="r")
+                    for name in ARRAY_NAMES
+                }
+            except FileNotFoundError:
+                cls._arrays = {}
+            except Exception as e:
+                logger.warning(f"Failed to load the local track index: {e}")
+                cls._arrays = {}
+        return cls._arrays
+
+    @classmethod
+    def _get_known_ids(cls) -> set[str]:
+        if cls._known_ids is None:
+            arrays = cls._load()
+            cls._known_ids = (
+                {track_id.decode() for track_id in arrays["ids"]} if arrays else set()
+            )
+        return cls._known_ids
+
+    @classmethod
+    def _get_row(cls, row: int) -> tuple[str, str, tuple[str, ...], int]:
+        arrays = cls._load()
+        text_offsets = arrays["text_offsets"]
+        text = bytes(arrays["text"][text_offsets[row] : text_offsets[row + 1]]).decode()
+        name, artists = text.split(NAME_SEPARATOR)
+        return (
+            bytes(arrays["ids"][row]).decode(),
+            name,
+            tuple(artists.split(ARTIST_SEPARATOR)) if artists else (),
+            int(arrays["durations"][row]),
+        )
+
+    @classmethod
+    def add_tracks(cls, tracks: list[dict]) -> None:
+        """Add Spotify tracks to the index.
+
+        Args:
+            tracks (list): Spotify track dicts, with id, name, artists and duration.
+        """
+        with cls._lock:
+            known_ids = cls._get_known_ids()
+            for track in tracks:
+                if not track or not track.get("id") or "name" not in track:
+                    continue
+                if track["id"] in known_ids:
+                    continue
+                known_ids.add(track["id"])
+                cls._pending[track["id"]] = (
+                    track["name"],
+                    tuple(artist["name"] for artist in track.get("artists", [])),
+                    int(track.get("duration_ms") or 0),
+                )
+                for token in tokenize(track["name"]):
+                    cls._pending_postings.setdefault(token, []).append(track["id"])
+
+    @classmethod
+    def candidates(cls, name: str) -> list[dict]:
+        """Find the indexed tracks sharing the most name tokens with a track name.
+
+        Args:
+            name (str): Track name.
+
+        Returns:
+            list: Up to `max_candidates` tracks, formatted as Spotify search items.
+        """
+        tokens = tokenize(name)
+        if not tokens:
+            return []
+        # All name tokens must match, but one for long names
+        min_shared = max(1, len(tokens) - 1) if len(tokens) > 3 else len(tokens)
+
+        found: list[tuple[int, str, str, tuple[str, ...], int]] = []
+        arrays = cls._load()
+        if arrays and len(arrays["token_hashes"]):
+            token_hashes = arrays["token_hashes"]
+            hashes = np.array([token_hash(token) for token in tokens], dtype=np.uint64)
+            positions = np.asarray(np.searchsorted(token_hashes, hashes))
+            in_range = positions < len(token_hashes)
+            positions, hashes = positions[in_range], hashes[in_range]
+            positions = positions[token_hashes[positions] == hashes]
+            if len(positions):
+                postings_offsets = arrays["postings_offsets"]
+                rows = np.concatenate(
+                    [
+                        arrays["postings"][
+                            postings_offsets[pos] : postings_offsets[pos + 1]
+                        ]
+                        for pos in positions
+                    ]
+                )
+                rows, n_shared = np.unique(rows, return_counts=True)
+                best = np.argsort(-n_shared, kind="stable")[: cls.max_candidates]
+                found.extend(
+                    (int(n_shared[i]), *cls._get_row(int(rows[i])))
+                    for i in best
+                    if n_shared[i] >= min_shared
+                )
+
+        pending_shared: dict[str, int] = {}
+        with cls._lock:
+            for token in tokens:
+                for track_id in cls._pending_postings.get(token, []):
+                    pending_shared[track_id] = pending_shared.get(track_id, 0) + 1
+            found.extend(
+                (n_shared, track_id, *cls._pending[track_id])
+                for track_id, n_shared in pending_shared.items()
+                if n_shared >= min_shared
+            )
+
+        found.sort(key=lambda candidate: -candidate[0])
+        return [
+            {
+                "id": track_id,
+                "name": track_name,
+                "artists": [{"name": artist} for artist in artists],
+                "duration_ms": duration_ms,
+            }
+            for _, track_id, track_name, artists, duration_ms in found[
+                : cls.max_candidates
+            ]
+        ]
+
+    @classmethod
+    def save(cls) -> None:
+        """Merge the tracks seen during the run into the saved index.
+
+        The saved arrays are merged as is, only the new tracks are tokenized.
+        """
+        with cls._lock:
+            if not cls._pending:
+                return
+            new_arrays = cls._merge_pending(cls._load())
+            try:
+                tmp_path = f"{TRACK_INDEX_PATH}.tmp"
+                os.makedirs(tmp_path, exist_ok=True)
+                for name, array in new_arrays.items():
+                    np.save(f"{tmp_path}/{name}.npy", array)
+                # Release the memory maps before replacing their files
+                cls._arrays = None
+                shutil.rmtree(TRACK_INDEX_PATH, ignore_errors=True)
+                os.replace(tmp_path, TRACK_INDEX_PATH)
+            except Exception as e:
+                logger.warning(f"Failed to save the local track index: {e}")
+                return
+            cls._pending = {}
+            cls._pending_postings = {}
+            # Dropped tracks can be added again
+            cls._known_ids = None
+        logger.info(
+            f"[+] Local track index: {len(new_arrays['ids']):,} tracks, "
+            f"{cls.n_local_matches:,} tracks matched without searches this run"
+        )
+
+    @classmethod
+    def _merge_pending(cls, arrays: dict[str, np.ndarray]) -> dict[str, np.ndarray]:
+        n_saved = len(arrays["ids"]) if arrays else 0
+        texts = [
+            f"{name}{NAME_SEPARATOR}{ARTIST_SEPARATOR.join(artists)}".encode()
+            for name, artists, _ in cls._pending.values()
+        ]
+        new_postings = [
+            (token_hash(token), row)
+            for row, (name, _, _) in enumerate(cls._pending.values(), start=n_saved)
+            for token in tokenize(name)
+        ]
+        ids = np.array(list(cls._pending), dtype="S22")
+        durations = np.array(
+            [duration_ms for _, _, duration_ms in cls._pending.values()], dtype=np.int64
+        )
+        text = np.frombuffer(b"".join(texts), dtype=np.uint8)
+        text_offsets = np.cumsum(
+            [0, *(len(track_text) for track_text in texts)], dtype=np.int64
+        )
+        hashes = np.array([h for h, _ in new_postings], dtype=np.uint64)
+        rows = np.array([row for _, row in new_postings], dtype=np.int64)
+        if n_saved:
+            ids = np.concatenate([arrays["ids"], ids])
+            durations = np.concatenate([arrays["durations"], durations])
+            text = np.concatenate([arrays["text"], text])
+            text_offsets = np.concatenate(
+                [arrays["text_offsets"], arrays["text_offsets"][-1] + text_offsets[1:]]
+            )
+            hashes = np.concatenate(
+                [
+                    np.repeat(
+                        arrays["token_hashes"], np.diff(arrays["postings_offsets"])
+                    ),
+                    hashes,
+                ]
+            )
+            rows = np.concatenate([arrays["postings"], rows])
+
+        # Drop the tracks saved first beyond max_tracks
+        n_dropped = max(len(ids) - cls.max_tracks, 0)
+        if n_dropped:
+            ids, durations = ids[n_dropped:], durations[n_dropped:]
+            text = text[text_offsets[n_dropped] :]
+            text_offsets = text_offsets[n_dropped:] - text_offsets[n_dropped]
+            kept = rows >= n_dropped
+            hashes, rows = hashes[kept], rows[kept] - n_dropped
+
+        order = np.lexsort((rows, hashes))
+        hashes, rows = hashes[order], rows[order]
+        token_hashes, first_positions = np.unique(hashes, return_index=True)
+        return {
+            "ids": ids,
+            "durations": durations,
+            "text": text,
+            "text_offsets": text_offsets,
+            "token_hashes": token_hashes,
+            "postings_offsets": np.append(first_positions, len(hashes)).astype(np.int64),
+            "postings": rows.astype(np.int32),
+        }
@@ -0,0 +1,77 @@
+"""Benchmark of parse_tracks on Beatport track dicts built from the test fixtures.
+
+Compares one pydantic validation per track with the validation of the whole page:
+
+    python -m tests.benchmarks.bench_parse_tracks
+"""
+
+import json
+import logging
+import timeit
+from functools import partial
+
+from src.beatport import parse_tracks
+from src.config import ROOT_PATH
+from src.models import BeatportTrack
+
+logger = logging.getLogger("bench_parse_tracks")
+
+PATH_FIXTURES = ROOT_PATH + "tests/core/chart_tracks.json"
+
+
+def beatport_track_dicts(n_tracks: int) -> list[dict]:
+    """Format the fixture tracks as in the Beatport __NEXT_DATA__ JSON."""
+    with open(PATH_FIXTURES) as fixtures_file:
+        fixtures = json.load(fixtures_file)
+    raw_tracks = [
+        {
+            "name": track["name"],
+            "mix_name": track["mix"],
+            "artists": [{"id": 1, "name": artist} for artist in track["artists"]],
+            "remixers": [{"id": 2, "name": remixer} for remixer in track["remixers"]],
+            "release": {"name": track["release"], "label": {"name": track["label"]}},
+            "publish_date": track["published_date"],
+            "length": track["duration"],
+            "length_ms": track["duration_ms"],
+            "isrc": None,
+            "genre": {"name": "Tech House"},
+            "bpm": 125,
+            "key": {"name": "A Minor"},
+        }
+        for track in fixtures
+    ]
+    return (raw_tracks * (n_tracks // len(raw_tracks) + 1))[:n_tracks]
+
+
+def parse_tracks_validated(raw_tracks_dicts: list[dict]) -> list[BeatportTrack]:
+    """Previous implementation of parse_tracks, one model_validate per track."""
+    return [
+        BeatportTrack.model_validate(
+            {
+                "name": track["name"],
+                "mix": track["mix_name"],
+                "artists": [artist["name"] for artist in track["artists"]],
+                "remixers": [remixer["name"] for remixer in track["remixers"]],
+                "release": track["release"]["name"],
+                "label": track["release"]["label"]["name"],
+                "published_date": track["publish_date"],
+                "duration": track["length"],
+                "duration_ms": track["length_ms"],
+                "isrc": track.get("isrc"),
+                "genre": track["genre"]["name"],
+                "bpm": track["bpm"],
+                "key": track["key"]["name"],
+            }
+        )
+        for track in raw_tracks_dicts
+    ]
+
+
+if __name__ == "__main__":
+    raw_tracks = beatport_track_dicts(10_000)
+    for name, function in [
+        ("model_validate", parse_tracks_validated),
+        ("validate_tracks", parse_tracks),
+    ]:
+        elapsed = min(timeit.repeat(partial(function, raw_tracks), number=1, repeat=5))
+        logger.info(f"{name}: {elapsed / len(raw_tracks) * 1e6:.1f} us per track")
@@ -0,0 +1,214 @@
+"""Benchmark of the search strategies on the fixtures of test_search_tracks.
+
+Compares the number of Spotify searches sent and the match accuracy of the narrow
+cascade (v2) and the wide candidate search. Spotify responses are replayed from a
+cassette, record it once with credentials:
+
+    python -m tests.benchmarks.bench_search_strategies --record
+    python -m tests.benchmarks.bench_search_strategies
+
+Without a cassette, searches are answered from a simulated catalog built from the
+fixtures: the expected track with decoy versions (radio edit, remix, same title by
+another artist), matched on the query words. Only the search counts are reported
+then, the accuracy against decoys built by the benchmark says nothing about the
+matching of real Spotify results.
+"""
+
+import argparse
+import ast
+import hashlib
+import json
+import logging
+import re
+from collections.abc import Callable
+from typing import Any
+
+from src import spotify_utils
+from src.config import ROOT_PATH
+from src.models import BeatportTrack
+from src.spotify_search import search_for_track_v2, search_for_track_wide
+from src.spotify_utils import TRACKS_DICT_NAMES, SearchMemo
+
+logger = logging.getLogger("bench_search_strategies")
+
+PATH_FIXTURES = ROOT_PATH + "tests/core/test_search_tracks.py"
+PATH_CASSETTE = ROOT_PATH + "tests/benchmarks/search_cassette.json"
+
+STRATEGIES: dict[str, Callable] = {
+    "v2": search_for_track_v2,
+    "wide": search_for_track_wide,
+}
+
+
+def load_fixtures() -> list[tuple[str, BeatportTrack, str | None]]:
+    """Extract the tracks and expected Spotify IDs of test_search_tracks."""
+    with open(PATH_FIXTURES) as fixtures_file:
+        tree = ast.parse(fixtures_file.read())
+
+    fixtures: list[tuple[str, BeatportTrack, str | None]] = []
+    for function in tree.body:
+        if not isinstance(function, ast.FunctionDef):
+            continue
+        track, expected_id, found_expected = None, None, False
+        for node in ast.walk(function):
+            if isinstance(node, ast.Assign) and isinstance(node.value, ast.Dict):
+                track = BeatportTrack(**ast.literal_eval(node.value))
+            if isinstance(node, ast.Assert) and isinstance(node.test, ast.Compare):
+                expected = node.test.comparators[0]
+                if isinstance(expected, ast.Constant) and (
+                    expected.value is None or isinstance(expected.value, str)
+                ):
+                    expected_id, found_expected = expected.value, True
+        if track is not None and found_expected:
+            fixtures.append((function.name, track, expected_id))
+    return fixtures
+
+
+class CassetteClient:
+    """Spotify client replaying, or recording, search responses."""
+
+    def __init__(self, responses: dict[str, dict], client: Any = None):
+        """Replay the responses, record missing ones with client if given."""
+        self.responses = responses
+        self.client = client
+
+    def search(self, query: str, limit: int = 10, offset: int = 0) -> dict:
+        """Search as spotipy.Spotify.search does."""
+        key = f"{query}|{limit}|{offset}"
+        if key not in self.responses:
+            if self.client is None:
+                logger.warning(f"Query not in cassette: {key}")
+                return {"tracks": {"items": []}}
+            result = self.client.search(query, limit=limit, offset=offset)
+            self.responses[key] = {
+                "tracks": {
+                    "items": [
+                        {name: item[name] for name in TRACKS_DICT_NAMES if name in item}
+                        for item in result["tracks"]["items"]
+                        if item
+                    ]
+                }
+            }
+        return self.responses[key]
+
+
+def _words(text: str) -> set[str]:
+    return set(re.findall(r"\w+", text.casefold()))
+
+
+class CatalogClient:
+    """Spotify client searching a simulated catalog of the fixture tracks."""
+
+    def __init__(self, fixtures: list[tuple[str, BeatportTrack, str | None]]):
+        """Build the catalog, from the most to the least popular version."""
+        self.catalog: list[dict] = []
+        for test_name, track, expected_id in fixtures:
+            versions = [
+                (f"{track.name} - Radio Edit", track.artists, 0.55, "edit"),
+                (f"{track.name} - Club Remix", [*track.artists, "Club"], 1.1, "remix"),
+                (track.name, ["Tribute DJs"], 0.95, "cover"),
+            ]
+            if expected_id is not None:
+                name = track.name if track.mix == "Original Mix" else track.full_name
+                versions.insert(2, (name, track.artists, 1.0, expected_id))
+            for i_version, version in enumerate(versions):
+                version_name, artists, duration_ratio, version_id = version
+                if version_id != expected_id:
+                    version_id = hashlib.blake2b(
+                        f"{test_name}{version_id}".encode(), digest_size=11
+                    ).hexdigest()
+                self.catalog.append(
+                    {
+                        "id": version_id,
+                        "name": version_name,
+                        "artists": [{"name": artist} for artist in artists],
+                        "duration_ms": int(track.duration_ms * duration_ratio),
+                        "popularity": 60 - 10 * i_version,
+                        "album": track.release,
+                        "label": track.label,
+                    }
+                )
+
+    @staticmethod
+    def _matches(item: dict, query: str) -> bool:
+        fields = {
+            "track": item["name"],
+            "artist": " ".join(artist["name"] for artist in item["artists"]),
+            "album": item["album"],
+            "label": item["label"],
+        }
+        for field, value in re.findall(r'(\w+):"([^"]*)"', query):
+            if not _words(value) <= _words(fields.get(field, "")):
+                return False
+        free_text = re.sub(r'\w+:"[^"]*"', " ", query)
+        return _words(free_text) <= _words(" ".join(fields.values()))
+
+    def search(self, query: str, limit: int = 10, offset: int = 0) -> dict:
+        """Search as spotipy.Spotify.search does, every query word must match."""
+        items = [item for item in self.catalog if self._matches(item, query)]
+        return {
+            "tracks": {
+                "items": [
+                    {name: item[name] for name in TRACKS_DICT_NAMES if name in item}
+                    for item in items[offset : offset + limit]
+                ]
+            }
+        }
+
+
+def run_benchmark(record: bool = False) -> dict[str, dict[str, float]]:
+    """Run every strategy on the fixtures and return calls and accuracy.
+
+    The accuracy is only measured on responses replayed from the cassette.
+    """
+    fixtures = load_fixtures()
+    client: CassetteClient | CatalogClient
+    try:
+        with open(PATH_CASSETTE) as cassette_file:
+            responses = json.load(cassette_file)
+    except FileNotFoundError:
+        responses = {}
+    if responses or record:
+        client = CassetteClient(
+            responses, spotify_utils.SpotifyClient.get_instance() if record else None
+        )
+    else:
+        logger.info(f"No cassette at {PATH_CASSETTE}, searching a simulated catalog")
+        client = CatalogClient(fixtures)
+    spotify_utils.spotify_auth = lambda verbose_aut=False: client
+
+    results = {}
+    for strategy_name, strategy in STRATEGIES.items():
+        SearchMemo._results.clear()
+        SearchMemo.n_calls = 0
+        n_correct = 0
+        for test_name, track, expected_id in fixtures:
+            track_id = strategy(track, silent=True)
+            n_correct += track_id == expected_id
+            logger.info(f"{strategy_name} {test_name}: {track_id} ({expected_id})")
+        results[strategy_name] = {
+            "calls": SearchMemo.n_calls,
+            "calls_per_track": SearchMemo.n_calls / len(fixtures),
+        }
+        if isinstance(client, CassetteClient):
+            results[strategy_name]["accuracy"] = n_correct / len(fixtures)
+
+    if record:
+        with open(PATH_CASSETTE, "w") as cassette_file:
+            json.dump(responses, cassette_file)
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--record", action="store_true", help="Record missing responses from Spotify"
+    )
+    args = parser.parse_args()
+
+    for strategy_name, result in run_benchmark(record=args.record).items():
+        logger.info(
+            f"{strategy_name}: {result['calls']} searches, "
+            f"{result['calls_per_track']:.1f} per track"
+            + (f", accuracy {result['accuracy']:.0%}" if "accuracy" in result else "")
+        )
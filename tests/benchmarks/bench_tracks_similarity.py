@@ -0,0 +1,102 @@
+"""Micro-benchmark of the batched track scoring against the SequenceMatcher loop.
+
+Candidates last within the duration tolerance of the source track, so that every
+one of them is string scored. The duration prefilter, skipping the candidates
+outside the window, is measured separately with random durations.
+
+python -m tests.benchmarks.bench_tracks_similarity
+"""
+
+import logging
+import random
+import timeit
+from difflib import SequenceMatcher
+from functools import partial
+
+from src.models import BeatportTrack
+from src.spotify_utils import duration_tolerance_ms, score_tracks
+
+logger = logging.getLogger("bench_tracks_similarity")
+
+source_track = BeatportTrack(
+    name="Taking Flight feat. Nathan Nicholson",
+    mix="Colyn Extended Remix",
+    artists=["Eelke Kleijn", "Nathan Nicholson"],
+    remixers=["Colyn"],
+    release="Taking Flight - Colyn Remix",
+    label="DAYS like NIGHTS",
+    duration="6:56",
+    duration_ms=416553,
+)
+
+
+def tracks_similarity_sequence_matcher(
+    source_track: BeatportTrack, found_tracks: list[dict]
+) -> list[float]:
+    """Previous implementation of tracks_similarity, one SequenceMatcher per pair."""
+    tracks_sim = []
+    for track in found_tracks:
+        sim_artists = max(
+            SequenceMatcher(None, artist_s.lower(), artist_r["name"].lower()).ratio()
+            for artist_s in source_track.artists
+            for artist_r in track["artists"]
+        )
+        track_n_s = source_track.name + (
+            "" if not source_track.mix else f" - {source_track.mix}"
+        )
+        sim_name = SequenceMatcher(None, track_n_s, track["name"]).ratio()
+        tracks_sim.append(sim_artists * sim_name)
+    return tracks_sim
+
+
+def random_found_tracks(n_tracks: int, in_window: bool = True) -> list[dict]:
+    """Build Spotify search items with variations of the source track.
+
+    Durations are within the duration window of the source track if in_window,
+    random otherwise.
+    """
+    names = [
+        "Taking Flight",
+        "Taking Flight - Colyn Extended Remix",
+        "Taking Flight (feat. Nathan Nicholson) - Colyn Remix",
+        "Taking Flight - Radio Edit",
+        "Flight Mode",
+    ]
+    artists = ["Eelke Kleijn", "Nathan Nicholson", "Colyn", "Someone Else", "Kleijn"]
+    return [
+        {
+            "id": str(i_track),
+            "name": random.choice(names),
+            "artists": [{"name": artist} for artist in random.sample(artists, 2)],
+            "duration_ms": source_track.duration_ms
+            + random.randint(-duration_tolerance_ms, duration_tolerance_ms)
+            if in_window
+            else random.randint(200000, 500000),
+        }
+        for i_track in range(n_tracks)
+    ]
+
+
+if __name__ == "__main__":
+    random.seed(0)
+    for n_tracks in [10, 50, 200]:
+        found_tracks = random_found_tracks(n_tracks)
+        n_runs = 2000 // n_tracks
+        time_previous = timeit.timeit(
+            partial(tracks_similarity_sequence_matcher, source_track, found_tracks),
+            number=n_runs,
+        )
+        time_batched = timeit.timeit(
+            partial(score_tracks, source_track, found_tracks), number=n_runs
+        )
+        time_prefiltered = timeit.timeit(
+            partial(score_tracks, source_track, random_found_tracks(n_tracks, False)),
+            number=n_runs,
+        )
+        logger.info(
+            f"{n_tracks} candidates: "
+            f"SequenceMatcher {time_previous / n_runs * 1e3:.2f} ms"
+            f", batched {time_batched / n_runs * 1e3:.2f} ms"
+            f", x{time_previous / time_batched:.1f}"
+            f", random durations {time_prefiltered / n_runs * 1e3:.2f} ms"
+        )
@@ -0,0 +1,22 @@
+"""Fixtures shared by the core tests."""
+
+from collections.abc import Callable
+
+import pytest
+
+SpotifyItem = Callable[[str, str, list[str], int], dict]
+
+
+@pytest.fixture
+def spotify_item() -> SpotifyItem:
+    """Return a function building a minimal Spotify track."""
+
+    def build(track_id: str, name: str, artists: list[str], duration_ms: int) -> dict:
+        return {
+            "id": track_id,
+            "name": name,
+            "artists": [{"name": artist} for artist in artists],
+            "duration_ms": duration_ms,
+        }
+
+    return build
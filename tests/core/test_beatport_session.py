@@ -0,0 +1,137 @@
+"""Test the loading of Beatport pages."""
+
+import json
+from collections import deque
+from collections.abc import Callable
+
+import pytest
+from requests.cookies import RequestsCookieJar
+
+from src.beatport import (
+    NEXT_DATA_TEXT_SCRIPT,
+    BeatportBrowser,
+    BeatportSession,
+    PageLoadTimer,
+    get_beatport_page_script_queries,
+)
+
+NEXT_DATA = {"props": {"pageProps": {"dehydratedState": {"queries": [{"id": 1}]}}}}
+
+
+class FakeResponse:
+    """Response of requests.Session.get."""
+
+    def __init__(self, status_code: int, text: str):
+        """Response with a status code and a body."""
+        self.status_code = status_code
+        self.text = text
+
+
+class FakeSession:
+    """Session returning the same response to every request."""
+
+    def __init__(self, response: FakeResponse):
+        """Session returning response."""
+        self.response = response
+        self.n_requests = 0
+        self.headers: dict[str, str] = {}
+        self.cookies = RequestsCookieJar()
+
+    def get(self, url: str, timeout: float) -> FakeResponse:
+        """Get the response."""
+        self.n_requests += 1
+        return self.response
+
+
+SetResponse = Callable[[int, str], FakeSession]
+
+
+@pytest.fixture
+def fake_session(monkeypatch: pytest.MonkeyPatch) -> SetResponse:
+    """Replace the session, return a function setting its response."""
+    monkeypatch.setattr(BeatportSession, "is_challenged", False)
+
+    def set_response(status_code: int, text: str) -> FakeSession:
+        session = FakeSession(FakeResponse(status_code, text))
+        monkeypatch.setattr(BeatportSession, "_session", session)
+        return session
+
+    return set_response
+
+
+def test_fetch_next_data(fake_session: SetResponse) -> None:
+    """The __NEXT_DATA__ script of the page is parsed."""
+    fake_session(
+        200,
+        '<html><script id="__NEXT_DATA__" type="application/json">'
+        f"{json.dumps(NEXT_DATA)}</script></html>",
+    )
+    assert BeatportSession.fetch_next_data("https://www.beatport.com") == NEXT_DATA
+    assert not BeatportSession.is_challenged
+
+    # Truncated page data falls back to the browser
+    fake_session(
+        200,
+        '<html><script id="__NEXT_DATA__" type="application/json">'
+        f"{json.dumps(NEXT_DATA)[:20]}</script></html>",
+    )
+    assert BeatportSession.fetch_next_data("https://www.beatport.com") is None
+    assert not BeatportSession.is_challenged
+
+
+def test_challenge_disables_http(fake_session: SetResponse) -> None:
+    """After a Cloudflare challenge, pages are not fetched until cookies are synced."""
+    session = fake_session(403, "<title>Just a moment...</title>")
+    assert BeatportSession.fetch_next_data("https://www.beatport.com") is None
+    assert BeatportSession.is_challenged
+
+    assert BeatportSession.fetch_next_data("https://www.beatport.com") is None
+    assert session.n_requests == 1
+
+
+def test_page_load_timeout(monkeypatch: pytest.MonkeyPatch) -> None:
+    """The timeout follows the recent page loads, within its bounds."""
+    monkeypatch.setattr(PageLoadTimer, "_latencies", deque(maxlen=20))
+    assert PageLoadTimer.timeout() == PageLoadTimer.max_timeout
+
+    PageLoadTimer._latencies.append(1.0)
+    assert PageLoadTimer.timeout() == PageLoadTimer.min_timeout
+    PageLoadTimer._latencies.append(5.0)
+    assert PageLoadTimer.timeout() == 15.0
+    assert PageLoadTimer.timeout(retry=True) == PageLoadTimer.max_timeout
+
+
+class FakeDriver:
+    """Browser with a rendered Beatport page."""
+
+    window_handles = ("window",)
+
+    def get(self, url: str) -> None:
+        """Load a page."""
+
+    def execute_script(self, script: str) -> object:
+        """Run a script in the page."""
+        if script == NEXT_DATA_TEXT_SCRIPT:
+            return json.dumps(NEXT_DATA)
+        if "userAgent" in script:
+            return "Mozilla/5.0"
+        return True
+
+    def get_cookies(self) -> list[dict]:
+        """Get the cookies of the browser."""
+        return [{"name": "cf_clearance", "value": "token", "domain": ".beatport.com"}]
+
+
+def test_browser_fallback(
+    fake_session: SetResponse, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """After a challenge, the page data is read in the browser and HTTP is resumed."""
+    fake_session(503, "<title>Just a moment...</title>")
+    monkeypatch.setattr(BeatportBrowser, "get_driver", FakeDriver)
+    monkeypatch.setattr(BeatportBrowser, "cookies_checked", True)
+    url = "https://www.beatport.com/genre/techno/6/top-100"
+    get_beatport_page_script_queries.cache_clear()
+
+    assert get_beatport_page_script_queries(url) == [{"id": 1}]
+    assert not BeatportSession.is_challenged
+    assert BeatportSession.get_session().cookies.get("cf_clearance") == "token"
@@ -1,10 +1,15 @@
 """Test clean track name function."""
 
 import logging
+import random
 
 import pytest
 
 from src.search_utils import clean_track_name
+from tests.benchmarks.bench_clean_track_name import (
+    clean_track_name_sequential,
+    synthetic_titles,
+)
 
 # RUN in debug for logs output in debug console
 # Or logs are in the Output / Python Test Log
@@ -60,3 +65,37 @@ def test_clean_track_names(input_track_name: str, expected_cleaned_name: str) ->
     """
     cleaned_name = clean_track_name(input_track_name)
     assert cleaned_name == expected_cleaned_name
+
+
+def test_clean_track_name_matches_sequential_rules() -> None:
+    """The rule table gives the same output as the sequential substitutions."""
+    rng = random.Random(0)
+    fragments = [
+        *synthetic_titles(50),
+        "feat.",
+        "Ft.",
+        "FEAT. ",
+        " - ",
+        "(",
+        ")",
+        "&",
+        "Radio",
+        " Edit",
+        "Ext",
+        "ended",
+        "Original",
+        " mix",
+        "Vox",
+        "\u017f",
+        "\u0131",
+        "\u212a",
+        "  ",
+    ]
+    titles = [
+        "Track Radio Ed\u0131t",
+        "Track - Or\u0130ginal Mix",
+        "Track (\u017foo) Ext (ft. Artist)ended",
+        *("".join(rng.choices(fragments, k=rng.randint(1, 8))) for _ in range(20_000)),
+    ]
+    for title in titles:
+        assert clean_track_name(title) == clean_track_name_sequential(title), title
@@ -0,0 +1,66 @@
+"""Test normalized attributes of BeatportTrack."""
+
+from src.models import BeatportTrack, validate_tracks
+
+track_search = BeatportTrack(
+    name="Taking Flight feat. Nathan Nicholson",
+    mix="Original Mix",
+    artists=["Eelke Kleijn", "Nathan Nicholson"],
+    remixers=[],
+    release="Taking Flight",
+    label="DAYS like NIGHTS",
+    duration="6:56",
+    duration_ms=416553,
+)
+
+
+def test_normalized_attributes() -> None:
+    """Normalized forms are computed from the name, mix and artists."""
+    assert track_search.full_name == "Taking Flight feat. Nathan Nicholson - Original Mix"
+    assert track_search.norm_name == "taking flight"
+    assert track_search.norm_artists == ("eelke kleijn", "nathan nicholson")
+    assert list(track_search.artist_variants)[:2] == [
+        ("original", "Eelke Kleijn"),
+        ("original", "Nathan Nicholson"),
+    ]
+    assert next(iter(track_search.name_variants)).name_mix == track_search.full_name
+
+
+def test_name_variants_are_lazy_and_unique() -> None:
+    """Variants are parsed on demand, once, and formatted differently."""
+    track = BeatportTrack(**track_search.model_dump())
+    variants = iter(track.name_variants)
+    first_variant = next(variants)
+    assert first_variant == (0, track.name, track.mix)
+    assert track.name_variants._items == [first_variant]
+
+    name_mixes = [variant.name_mix for variant in track.name_variants]
+    assert len(name_mixes) == len(set(name_mixes))
+    assert "Taking Flight - Radio-Edit" in name_mixes
+    assert [variant.name_mix for variant in track.name_variants] == name_mixes
+
+
+def test_normalized_attributes_cached_until_changed() -> None:
+    """Normalized forms are computed once and refreshed when the track changes."""
+    track = track_search.model_copy()
+    assert track.name_variants is track.name_variants
+
+    track.mix = "Extended Mix"
+    assert track.full_name == "Taking Flight feat. Nathan Nicholson - Extended Mix"
+
+    track_copy = track.model_copy(update={"name": "Taking Off"})
+    assert track_copy.full_name == "Taking Off - Extended Mix"
+    assert track_copy.fingerprint != track.fingerprint
+
+
+def test_validate_tracks_skips_invalid_tracks() -> None:
+    """Tracks are validated together, invalid ones are returned with their error."""
+    track_data = {**track_search.model_dump(), "genre": "Tech House", "bpm": 124}
+    invalid_data = {**track_data, "duration_ms": "unknown"}
+
+    tracks, invalid_tracks = validate_tracks([track_data, invalid_data, track_data])
+
+    assert tracks == [BeatportTrack.model_validate(track_data)] * 2
+    assert tracks[0].genre == "Tech House"
+    assert tracks[0].bpm == 124
+    assert [data for data, _ in invalid_tracks] == [invalid_data]
@@ -0,0 +1,97 @@
+"""Test removal of the duplicated tracks of a playlist."""
+
+import pytest
+
+from src import spotify_utils
+from src.spotify_utils import get_playlist_tracks_df, remove_playlist_duplicates
+
+
+class FakeClient:
+    """Spotify client serving a playlist and recording the removals."""
+
+    def __init__(self, uris: list[str], fail_removals: bool = False) -> None:
+        """Serve a playlist with the tracks of uris, in this order."""
+        self.items = [
+            {
+                "added_at": f"2024-01-01T00:{position // 60:02}:{position % 60:02}Z",
+                "track": {"id": uri.split(":")[-1], "uri": uri},
+            }
+            for position, uri in enumerate(uris)
+        ]
+        self.fail_removals = fail_removals
+        self.removals: list[tuple[list[dict], str]] = []
+        self.removed_uris: list[str] = []
+        self.added_uris: list[str] = []
+
+    def playlist(self, playlist_id: str, fields: str) -> dict:
+        """Get the playlist snapshot."""
+        return {"snapshot_id": "snapshot"}
+
+    def playlist_items(
+        self, playlist_id: str, additional_types: tuple, fields: str
+    ) -> dict:
+        """Get the first page of 100 items."""
+        return self.next({"offset": -100})
+
+    def next(self, pager: dict) -> dict:
+        """Get the next page of 100 items."""
+        offset = pager["offset"] + 100
+        return {
+            "items": self.items[offset : offset + 100],
+            "offset": offset,
+            "next": "next_page" if offset + 100 < len(self.items) else None,
+        }
+
+    def playlist_remove_specific_occurrences_of_items(
+        self, playlist_id: str, items: list[dict], snapshot_id: str
+    ) -> None:
+        """Remove items by position, from the given snapshot."""
+        if self.fail_removals:
+            raise ConnectionError("Read timed out")
+        self.removals.append((items, snapshot_id))
+
+    def playlist_remove_all_occurrences_of_items(
+        self, playlist_id: str, items: list[str]
+    ) -> None:
+        """Remove all the occurrences of items."""
+        self.removed_uris.extend(items)
+
+    def playlist_add_items(self, playlist_id: str, items: list[str]) -> None:
+        """Add items at the end of the playlist."""
+        self.added_uris.extend(items)
+
+
+def test_duplicates_removed_by_position(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Earlier occurrences are removed by 0-based position, 100 tracks per request."""
+    uris = [f"spotify:track:{i}" for i in range(150)]
+    client = FakeClient([*uris, *uris, uris[0]])
+    monkeypatch.setattr(spotify_utils, "spotify_auth", lambda: client)
+
+    tracks_df = get_playlist_tracks_df("playlist", "Playlist")
+    assert tracks_df is not None
+    remove_playlist_duplicates("playlist", tracks_df, "Playlist")
+
+    assert [len(items) for items, _ in client.removals] == [100, 50]
+    assert {snapshot_id for _, snapshot_id in client.removals} == {"snapshot"}
+    removed_items = [item for items, _ in client.removals for item in items]
+    assert removed_items[0] == {"uri": uris[0], "positions": [0, 150]}
+    assert removed_items[1:] == [
+        {"uri": uri, "positions": [position]}
+        for position, uri in enumerate(uris)
+        if position
+    ]
+
+
+def test_duplicates_removed_and_added_back_on_failure(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """Duplicates are removed and added back once when removal by position fails."""
+    uris = ["spotify:track:a", "spotify:track:b", "spotify:track:c"]
+    client = FakeClient([*uris, uris[1]], fail_removals=True)
+    monkeypatch.setattr(spotify_utils, "spotify_auth", lambda: client)
+
+    tracks_df = get_playlist_tracks_df("playlist", "Playlist")
+    assert tracks_df is not None
+    remove_playlist_duplicates("playlist", tracks_df, "Playlist")
+
+    assert client.removed_uris == client.added_uris == [uris[1]]
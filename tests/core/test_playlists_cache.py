@@ -0,0 +1,137 @@
+"""Test the persisted directory of the user playlists."""
+
+import json
+import threading
+from pathlib import Path
+
+import pytest
+
+from src import spotify_utils
+from src.spotify_utils import PlaylistDescriptionWriter, SpotifyClient, create_playlist
+
+
+def playlist_item(playlist_id: str, name: str) -> dict:
+    """Build a playlist of the user listing."""
+    return {"id": playlist_id, "name": name, "owner": {"id": "me"}, "description": ""}
+
+
+class FakeClient:
+    """Spotify client listing the user playlists, one playlist per page."""
+
+    def __init__(self, playlists: list[dict]) -> None:
+        """List playlists, the pages after the first wait for `release`."""
+        self.playlists = playlists
+        self.release = threading.Event()
+        self.release.set()
+        self.n_pages = 0
+
+    def _page(self, offset: int) -> dict:
+        self.n_pages += 1
+        return {
+            "items": self.playlists[offset : offset + 1],
+            "offset": offset,
+            "total": len(self.playlists),
+            "next": "next_page" if offset + 1 < len(self.playlists) else None,
+        }
+
+    def current_user_playlists(self, limit: int) -> dict:
+        """Get the first page of the listing."""
+        return self._page(0)
+
+    def next(self, pager: dict) -> dict:
+        """Get the next page of the listing."""
+        self.release.wait(timeout=5)
+        return self._page(pager["offset"] + 1)
+
+    def user_playlist_create(self, user: str, name: str, description: str) -> dict:
+        """Create a playlist."""
+        return playlist_item(f"id_{name}", name)
+
+
+@pytest.fixture
+def cache_path(monkeypatch: pytest.MonkeyPatch, tmp_path: Path) -> Path:
+    """Reset the playlists directory, persisted in a temporary file."""
+    path = tmp_path / "playlists.json"
+    monkeypatch.setattr(spotify_utils, "PLAYLISTS_CACHE_PATH", str(path))
+    monkeypatch.setattr(spotify_utils, "username", "me")
+    monkeypatch.setattr(SpotifyClient, "_playlists_cache", None)
+    monkeypatch.setattr(SpotifyClient, "_playlists_total", None)
+    monkeypatch.setattr(SpotifyClient, "_playlists_signature", None)
+    monkeypatch.setattr(SpotifyClient, "_added_playlists", {})
+    monkeypatch.setattr(SpotifyClient, "_refresh_thread", None)
+    monkeypatch.setattr(SpotifyClient, "_playlists_refreshed", False)
+    monkeypatch.setattr(PlaylistDescriptionWriter, "_descriptions", {})
+    return path
+
+
+def persist(path: Path, client: FakeClient, playlists: dict[str, str]) -> None:
+    """Persist a directory, checked against the current first page of client."""
+    first_page = client.current_user_playlists(limit=50)
+    path.write_text(
+        json.dumps(
+            {
+                "total": first_page["total"],
+                "signature": SpotifyClient._first_page_signature(first_page),
+                "playlists": playlists,
+            }
+        )
+    )
+    client.n_pages = 0
+
+
+def test_matching_directory_not_refreshed(
+    monkeypatch: pytest.MonkeyPatch, cache_path: Path
+) -> None:
+    """An up to date persisted directory is checked with the first page only."""
+    client = FakeClient([playlist_item("1", "First"), playlist_item("2", "Second")])
+    monkeypatch.setattr(SpotifyClient, "_instance", client)
+    persist(cache_path, client, {"First": "1", "Second": "2"})
+
+    assert SpotifyClient.get_cached_playlist_id("Second") == "2"
+    assert SpotifyClient._refresh_thread is None
+    assert client.n_pages == 1
+    # Playlists renamed beyond the first page are not seen until a refresh
+    assert not SpotifyClient.is_playlists_cache_complete()
+
+
+def test_changed_directory_refreshed_in_background(
+    monkeypatch: pytest.MonkeyPatch, cache_path: Path
+) -> None:
+    """A changed listing is refreshed in the background, misses wait for it."""
+    client = FakeClient([playlist_item("1", "First"), playlist_item("2", "Second")])
+    monkeypatch.setattr(SpotifyClient, "_instance", client)
+    persist(cache_path, client, {"First": "1", "Second": "2"})
+    client.playlists.append(playlist_item("3", "Third"))
+    client.release.clear()
+
+    assert SpotifyClient.get_cached_playlist_id("First") == "1"
+    assert SpotifyClient._refresh_thread is not None
+    threading.Timer(0.1, client.release.set).start()
+    assert SpotifyClient.get_cached_playlist_id("Third") == "3"
+    assert SpotifyClient.is_playlists_cache_complete()
+    persisted = json.loads(cache_path.read_text())
+    assert persisted["total"] == 3
+    assert persisted["playlists"] == {"First": "1", "Second": "2", "Third": "3"}
+
+
+def test_playlist_created_during_refresh(
+    monkeypatch: pytest.MonkeyPatch, cache_path: Path
+) -> None:
+    """A playlist created while the directory is refreshed is kept in it."""
+    client = FakeClient([playlist_item("1", "First"), playlist_item("2", "Second")])
+    monkeypatch.setattr(SpotifyClient, "_instance", client)
+    persist(cache_path, client, {"First": "1"})
+    client.playlists[0] = playlist_item("1", "Renamed")
+    client.release.clear()
+
+    assert SpotifyClient.get_cached_playlist_id("Renamed") == "1"
+    refresh_thread = SpotifyClient._refresh_thread
+    assert refresh_thread is not None
+    assert create_playlist("Created") == "id_Created"
+    client.release.set()
+    refresh_thread.join()
+
+    assert SpotifyClient.get_cached_playlist_id("Created") == "id_Created"
+    assert SpotifyClient.get_cached_playlist_id("Second") == "2"
+    persisted = json.loads(cache_path.read_text())
+    assert persisted["playlists"]["Created"] == "id_Created"
@@ -0,0 +1,178 @@
+"""Test search query plan of search_for_track_v2."""
+
+import json
+from pathlib import Path
+
+import pytest
+
+from src import spotify_search
+from src.models import BeatportTrack
+from src.search_utils import N_NAME_METHODS
+from src.spotify_search import (
+    PlannedQuery,
+    SpeculativeSearch,
+    StrategyStats,
+    _build_query_plan,
+    search_for_track_v2,
+)
+from src.spotify_utils import SearchMemo
+
+track_search = BeatportTrack(
+    name="Taking Flight feat. Nathan Nicholson",
+    mix="Original Mix",
+    artists=["Eelke Kleijn", "Nathan Nicholson"],
+    remixers=[],
+    release="Taking Flight",
+    label="DAYS like NIGHTS",
+    duration="6:56",
+    duration_ms=416553,
+)
+
+
+def test_query_plan_is_unique() -> None:
+    """Identical queries only appear once, in cascade order."""
+    plan = list(_build_query_plan(track_search, parse_track=True))
+    queries = [planned_query.query for planned_query in plan]
+
+    assert len(queries) == len(set(queries))
+    assert plan[0].strategy == "v2:m0:original:album"
+
+
+def test_query_plan_counts_duplicates(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Queries of skipped name variants are counted as plan duplicates."""
+    monkeypatch.setattr(SearchMemo, "n_plan_duplicates", 0)
+    track = BeatportTrack(**track_search.model_dump())
+
+    plan = list(_build_query_plan(track, parse_track=True))
+
+    n_queries = N_NAME_METHODS * 2 * len(list(track.artist_variants))
+    assert SearchMemo.n_plan_duplicates == n_queries - len(plan) > 0
+
+
+def test_search_v2_sends_each_query_once(monkeypatch: pytest.MonkeyPatch) -> None:
+    """A track that is not found sends each unique query once."""
+    sent_queries = []
+
+    def fake_search_wrapper(query: str) -> dict:
+        sent_queries.append(query)
+        return {"tracks": {"items": []}}
+
+    monkeypatch.setattr(spotify_search, "search_wrapper", fake_search_wrapper)
+    monkeypatch.setattr(StrategyStats, "_stats", {})
+
+    plan = list(_build_query_plan(track_search, parse_track=True))
+    track_id = search_for_track_v2(track_search, silent=True, parse_track=True)
+
+    assert track_id is None
+    assert sent_queries == [planned_query.query for planned_query in plan]
+
+
+def test_search_v2_stops_at_first_match(monkeypatch: pytest.MonkeyPatch) -> None:
+    """A track found by the first query does not parse its name variants."""
+    track = BeatportTrack(**track_search.model_dump())
+
+    def fake_search_wrapper(query: str) -> dict:
+        return {"tracks": {"items": []}}
+
+    monkeypatch.setattr(spotify_search, "search_wrapper", fake_search_wrapper)
+    monkeypatch.setattr(
+        spotify_search, "parse_search_results_spotify", lambda *_, **__: "track_id"
+    )
+    monkeypatch.setattr(StrategyStats, "_stats", {})
+
+    assert search_for_track_v2(track, silent=True, parse_track=True) == "track_id"
+    assert len(track.name_variants._items) == 1
+
+
+def test_ranked_search_stops_at_first_match(monkeypatch: pytest.MonkeyPatch) -> None:
+    """With strategy stats, a track found by the first query sent is not parsed."""
+    track = BeatportTrack(**track_search.model_dump())
+    sent_queries = []
+
+    def fake_search_wrapper(query: str) -> dict:
+        sent_queries.append(query)
+        return {"tracks": {"items": []}}
+
+    monkeypatch.setattr(spotify_search, "search_wrapper", fake_search_wrapper)
+    monkeypatch.setattr(
+        spotify_search, "parse_search_results_spotify", lambda *_, **__: "track_id"
+    )
+    monkeypatch.setattr(
+        StrategyStats,
+        "_stats",
+        {
+            "all": {
+                spotify_search.RESOLVED_KEY: StrategyStats.min_resolved,
+                "v2:m0:original:track": 6,
+                "v2:m0:original:album": 3,
+                "v2:m2:original:track": 1,
+            }
+        },
+    )
+
+    assert search_for_track_v2(track, silent=True, parse_track=True) == "track_id"
+    assert sent_queries == [f'track:"{track.full_name}" artist:"{track.artists[0]}"']
+    assert len(track.name_variants._items) == 1
+
+
+def test_speculative_search_keeps_plan_order(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Concurrent queries return the match of the first query in plan order."""
+    plan = list(_build_query_plan(track_search, parse_track=True))
+    matching_queries = {plan[1].query: "second", plan[2].query: "third"}
+
+    def fake_perform_planned_search(
+        planned_query: PlannedQuery, silent: bool
+    ) -> str | None:
+        return matching_queries.get(planned_query.query)
+
+    monkeypatch.setattr(
+        spotify_search, "_perform_planned_search", fake_perform_planned_search
+    )
+    monkeypatch.setattr(spotify_search, "speculative_queries", 3)
+    monkeypatch.setattr(StrategyStats, "_stats", {})
+    monkeypatch.setattr(SpeculativeSearch, "_executor", None)
+    monkeypatch.setattr(SpeculativeSearch, "n_sent", 0)
+    monkeypatch.setattr(SpeculativeSearch, "n_wasted", 0)
+
+    assert search_for_track_v2(track_search, silent=True) == "second"
+    assert SpeculativeSearch.n_sent - SpeculativeSearch.n_wasted == 2
+
+    matching_queries = {plan[-1].query: "last"}
+    assert search_for_track_v2(track_search, silent=True) == "last"
+
+
+def test_strategy_ranking(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Strategies with the best hit rate on the label are tried first."""
+    plan = list(_build_query_plan(track_search, parse_track=True))
+    best_strategy = plan[-1].strategy
+    scopes = StrategyStats.scopes(track_search, genre="Progressive House")
+    monkeypatch.setattr(StrategyStats, "_stats", {})
+
+    # Not enough resolved tracks yet, the default order is kept
+    StrategyStats.record_hit(best_strategy, scopes[1:2], n_searches=len(plan))
+    assert StrategyStats.rank(plan, scopes) == plan
+
+    for _ in range(StrategyStats.min_resolved):
+        StrategyStats.record_hit(best_strategy, scopes[1:2], n_searches=len(plan))
+    ranked_plan = list(StrategyStats.rank(plan, scopes))
+
+    # The plan is pulled up to the first query of the best strategy only
+    best_query = next(p for p in plan if p.strategy == best_strategy)
+    assert ranked_plan == [best_query] + [p for p in plan if p != best_query]
+
+
+def test_strategy_stats_expire(monkeypatch: pytest.MonkeyPatch, tmp_path: Path) -> None:
+    """Scopes not resolved for more than max_age_days are not saved."""
+    stats_path = tmp_path / "stats.json"
+    monkeypatch.setattr(spotify_search, "STRATEGY_STATS_PATH", str(stats_path))
+    monkeypatch.setattr(StrategyStats, "_stats", {})
+    StrategyStats.record_hit("name_artists", ["label:recent"], n_searches=1)
+    StrategyStats.record_hit("name_artists", ["label:old"], n_searches=1)
+    StrategyStats._stats["label:old"][spotify_search.LAST_RESOLVED_KEY] -= (
+        StrategyStats.max_age_days + 1
+    )
+
+    StrategyStats.save()
+
+    assert list(json.loads(stats_path.read_text())) == ["label:recent"]
+    assert not (tmp_path / "stats.json.tmp").exists()
@@ -0,0 +1,222 @@
+"""Test wide candidate, ISRC, release and label catalog searches."""
+
+from collections.abc import Callable
+
+import pytest
+
+from src import spotify_search, spotify_utils
+from src.models import BeatportTrack
+from src.spotify_search import (
+    ResolutionTable,
+    search_for_track_wide,
+    search_track_function,
+)
+
+track_search = BeatportTrack(
+    name="Sete",
+    mix="Original Mix",
+    artists=["BLOND:ISH", "Amadou & Mariam", "Francis Mercier"],
+    remixers=[],
+    release="Sete",
+    label="Insomniac Records",
+    duration="6:35",
+    duration_ms=395040,
+)
+
+
+def test_wide_search_scores_candidates_locally(
+    monkeypatch: pytest.MonkeyPatch, spotify_item: Callable[..., dict]
+) -> None:
+    """The matching candidate is picked among other versions with a single query."""
+    sent_queries = []
+    candidates = [
+        spotify_item("radio", "Sete - Radio Edit", ["BLOND:ISH", "Francis Mercier"], 1),
+        spotify_item("other", "Sete", ["Someone Else"], 395040),
+        spotify_item(
+            "original",
+            "Sete",
+            ["BLOND:ISH", "Amadou & Mariam", "Francis Mercier"],
+            395040,
+        ),
+    ]
+
+    def fake_search_wrapper(query: str, limit: int = 10, offset: int = 0) -> dict:
+        sent_queries.append((query, limit, offset))
+        return {"tracks": {"items": candidates}}
+
+    monkeypatch.setattr(spotify_search, "search_wrapper", fake_search_wrapper)
+
+    assert search_for_track_wide(track_search, silent=True) == "original"
+    assert len(sent_queries) == 1
+
+
+def test_wide_search_falls_back_to_v2(monkeypatch: pytest.MonkeyPatch) -> None:
+    """The narrow cascade is used when no candidate is close enough."""
+    monkeypatch.setattr(
+        spotify_search,
+        "search_wrapper",
+        lambda query, limit=10, offset=0: {"tracks": {"items": []}},
+    )
+    monkeypatch.setattr(
+        spotify_search, "search_for_track_v2", lambda track, **kwargs: "narrow"
+    )
+
+    assert search_for_track_wide(track_search, silent=True) == "narrow"
+
+
+def test_isrc_search_runs_first(
+    monkeypatch: pytest.MonkeyPatch, spotify_item: Callable[..., dict]
+) -> None:
+    """A track with an ISRC is resolved with a single ISRC query."""
+    sent_queries = []
+
+    def fake_search_wrapper(query: str, limit: int = 10, offset: int = 0) -> dict:
+        sent_queries.append(query)
+        return {"tracks": {"items": [spotify_item("isrc_match", "Sete", [], 395040)]}}
+
+    monkeypatch.setattr(spotify_search, "search_wrapper", fake_search_wrapper)
+    monkeypatch.setattr(ResolutionTable, "_track_ids", {})
+    track_isrc = track_search.model_copy(update={"isrc": "GBKQU2200123"})
+
+    assert spotify_search.search_track_function(track_isrc, silent=True) == "isrc_match"
+    assert sent_queries == ["isrc:GBKQU2200123"]
+
+
+def test_release_tracks_matched_from_album(
+    monkeypatch: pytest.MonkeyPatch, spotify_item: Callable[..., dict]
+) -> None:
+    """Tracks sharing a release are matched with a single album lookup."""
+    album_lookups = []
+    album_tracks = [
+        spotify_item("original", "Sete", track_search.artists, 395040),
+        spotify_item("dub", "Sete - Dub Mix", track_search.artists, 401000),
+    ]
+
+    def fake_get_album_tracks(release: str, label: str) -> list[dict]:
+        album_lookups.append((release, label))
+        return album_tracks
+
+    monkeypatch.setattr(spotify_search, "get_album_tracks", fake_get_album_tracks)
+    track_dub = track_search.model_copy(update={"mix": "Dub Mix", "duration_ms": 401000})
+    track_single = track_search.model_copy(update={"release": "Another Release"})
+
+    track_ids = spotify_search.match_release_tracks(
+        [track_search, track_single, track_dub], silent=True
+    )
+
+    assert track_ids == ["original", None, "dub"]
+    assert album_lookups == [("Sete", "Insomniac Records")]
+
+
+def test_label_catalog_matched_in_memory(
+    monkeypatch: pytest.MonkeyPatch, spotify_item: Callable[..., dict]
+) -> None:
+    """Tracks are matched against the label catalog, by track name."""
+    catalog = [
+        spotify_item("original", "Sete", track_search.artists, 395040),
+        spotify_item("other", "Another Track", track_search.artists, 395040),
+    ]
+    monkeypatch.setattr(spotify_search, "get_label_catalog", lambda label: catalog)
+    track_missing = track_search.model_copy(update={"name": "Missing"})
+
+    track_ids = spotify_search.match_label_catalog(
+        "Insomniac Records", [track_search, track_missing], silent=True
+    )
+
+    assert track_ids == ["original", None]
+
+
+def test_tracks_resolved_once_per_run(monkeypatch: pytest.MonkeyPatch) -> None:
+    """The same track synced to several playlists is only searched once."""
+    searched_tracks = []
+
+    def fake_search_track(track: BeatportTrack, *args: object) -> str | None:
+        searched_tracks.append(track)
+        return "sete" if track.name == "Sete" else None
+
+    monkeypatch.setattr(spotify_search, "_search_track", fake_search_track)
+    monkeypatch.setattr(ResolutionTable, "_track_ids", {})
+    monkeypatch.setattr(ResolutionTable, "n_lookups", 0)
+    monkeypatch.setattr(ResolutionTable, "n_resolved_before", 0)
+    track_missing = track_search.model_copy(update={"name": "Unknown"})
+
+    for genre in ["All Genres", "Afro House", "Afro House"]:
+        assert search_track_function(track_search.model_copy(), genre=genre) == "sete"
+        assert search_track_function(track_missing, genre=genre) is None
+
+    assert len(searched_tracks) == 2
+    assert ResolutionTable.n_resolved_before == 4
+
+
+def test_album_tracks_failures_not_cached(
+    monkeypatch: pytest.MonkeyPatch, spotify_item: Callable[..., dict]
+) -> None:
+    """A failed album lookup is retried and callers get copies of the tracklist."""
+    album_tracks = [spotify_item("original", "Sete", track_search.artists, 395040)]
+
+    class FlakyClient:
+        n_searches = 0
+
+        def search(self, q: str, type: str, limit: int) -> dict:
+            self.n_searches += 1
+            if self.n_searches == 1:
+                raise ConnectionError("Read timed out")
+            return {"albums": {"items": [{"id": "album", "name": "Sete"}]}}
+
+        def album_tracks(self, album_id: str, limit: int) -> dict:
+            return {"items": [dict(track) for track in album_tracks], "next": None}
+
+    client = FlakyClient()
+    monkeypatch.setattr(spotify_utils, "spotify_auth", lambda: client)
+    monkeypatch.setattr(spotify_utils.TrackIndex, "add_tracks", lambda tracks: None)
+    spotify_utils._fetch_album_tracks.cache_clear()
+
+    assert spotify_utils.get_album_tracks("Sete", "Insomniac Records") == []
+    tracks = spotify_utils.get_album_tracks("Sete", "Insomniac Records")
+    tracks[0]["id"] = "altered"
+
+    assert spotify_utils.get_album_tracks("Sete", "Insomniac Records") == album_tracks
+    assert client.n_searches == 2
+    spotify_utils._fetch_album_tracks.cache_clear()
+
+
+def test_bulk_match_keeps_earlier_resolution(monkeypatch: pytest.MonkeyPatch) -> None:
+    """A track resolved earlier in the run keeps its Spotify ID after a bulk match."""
+    monkeypatch.setattr(ResolutionTable, "_track_ids", {})
+    monkeypatch.setattr(
+        spotify_search, "match_release_tracks", lambda tracks, silent: ["album"]
+    )
+    ResolutionTable.record(track_search, "searched")
+
+    assert spotify_search._match_tracks_in_bulk([track_search], None, True) == ["album"]
+    assert ResolutionTable.is_resolved(track_search)
+    assert search_track_function(track_search) == "searched"
+
+
+def test_label_catalog_failures_not_cached(
+    monkeypatch: pytest.MonkeyPatch, spotify_item: Callable[..., dict]
+) -> None:
+    """A catalog failing partway through paging is fetched again on the next call."""
+    album_tracks = [spotify_item("original", "Sete", track_search.artists, 395040)]
+
+    class FlakyClient:
+        n_albums_calls = 0
+
+        def search(self, q: str, type: str, limit: int, offset: int) -> dict:
+            return {"albums": {"items": [{"id": "album"}], "next": None}}
+
+        def albums(self, album_ids: list[str]) -> dict:
+            self.n_albums_calls += 1
+            if self.n_albums_calls == 1:
+                raise ConnectionError("Read timed out")
+            return {"albums": [{"tracks": {"items": album_tracks, "next": None}}]}
+
+    client = FlakyClient()
+    monkeypatch.setattr(spotify_utils, "spotify_auth", lambda: client)
+    monkeypatch.setattr(spotify_utils.TrackIndex, "add_tracks", lambda tracks: None)
+    spotify_utils._fetch_label_catalog.cache_clear()
+
+    assert spotify_utils.get_label_catalog("Insomniac Records") == []
+    assert spotify_utils.get_label_catalog("Insomniac Records") == album_tracks
+    assert client.n_albums_calls == 2
+    spotify_utils._fetch_label_catalog.cache_clear()
@@ -0,0 +1,49 @@
+"""Test single-flight sharing of identical concurrent calls."""
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from src.spotify_utils import SingleFlight
+
+
+def test_concurrent_calls_share_one_call() -> None:
+    """A call made while the same one is in flight waits for its result."""
+    single_flight = SingleFlight()
+    release = threading.Event()
+    n_calls = 0
+
+    def slow_search() -> dict:
+        nonlocal n_calls
+        n_calls += 1
+        release.wait(timeout=5)
+        return {"tracks": {"items": []}}
+
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        first = executor.submit(single_flight.do, "query", slow_search)
+        second = executor.submit(single_flight.do, "query", slow_search)
+        while single_flight.n_shared == 0 and not second.done():
+            time.sleep(0.01)
+        release.set()
+
+        assert first.result() is second.result()
+    assert n_calls == 1
+    assert single_flight.n_shared == 1
+
+    # Once done, the same call is made again
+    single_flight.do("query", slow_search)
+    assert n_calls == 2
+
+
+def test_exception_is_shared_and_cleared() -> None:
+    """The exception of a call is raised, and the key can be called again."""
+    single_flight = SingleFlight()
+
+    def failing_search() -> dict:
+        raise ValueError("search failed")
+
+    with pytest.raises(ValueError, match="search failed"):
+        single_flight.do("query", failing_search)
+    assert single_flight.do("query", dict) == {}
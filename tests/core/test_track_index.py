@@ -0,0 +1,107 @@
+"""Test local index of known Spotify tracks."""
+
+from collections.abc import Callable
+from pathlib import Path
+
+import pytest
+
+from src import track_index
+from src.models import BeatportTrack
+from src.spotify_search import search_for_track_local
+from src.track_index import TrackIndex
+
+
+def test_index_saved_and_memory_mapped(
+    monkeypatch: pytest.MonkeyPatch, tmp_path: Path, spotify_item: Callable[..., dict]
+) -> None:
+    """Tracks seen are found before and after saving and reloading the index."""
+    monkeypatch.setattr(track_index, "TRACK_INDEX_PATH", str(tmp_path / "index"))
+    monkeypatch.setattr(TrackIndex, "_arrays", None)
+    monkeypatch.setattr(TrackIndex, "_known_ids", None)
+    monkeypatch.setattr(TrackIndex, "_pending", {})
+    monkeypatch.setattr(TrackIndex, "_pending_postings", {})
+
+    TrackIndex.add_tracks(
+        [
+            spotify_item("4u3XiAwJ2U9Kxgy57gcAPB", "Sete", ["BLOND:ISH"], 395040),
+            spotify_item("3plaSBlILmcUoVBAHDca5c", "Toma Dale", ["Classmatic"], 323720),
+        ]
+    )
+    assert [c["id"] for c in TrackIndex.candidates("Toma Dale")] == [
+        "3plaSBlILmcUoVBAHDca5c"
+    ]
+
+    TrackIndex.save()
+    monkeypatch.setattr(TrackIndex, "_arrays", None)
+    TrackIndex.add_tracks(
+        [spotify_item("7gznOBAlfJYgOBGdMM3Pas", "Mumble - Extended", ["Kormak"], 1)]
+    )
+
+    assert TrackIndex.candidates("Sete") == [
+        spotify_item("4u3XiAwJ2U9Kxgy57gcAPB", "Sete", ["BLOND:ISH"], 395040)
+    ]
+    assert [c["id"] for c in TrackIndex.candidates("Mumble")] == [
+        "7gznOBAlfJYgOBGdMM3Pas"
+    ]
+    assert TrackIndex.candidates("Unknown") == []
+    assert TrackIndex._load()["ids"].filename is not None
+
+
+def test_index_drops_oldest_tracks(
+    monkeypatch: pytest.MonkeyPatch, tmp_path: Path, spotify_item: Callable[..., dict]
+) -> None:
+    """Beyond max_tracks, the tracks saved first are dropped from the index."""
+    monkeypatch.setattr(track_index, "TRACK_INDEX_PATH", str(tmp_path / "index"))
+    monkeypatch.setattr(TrackIndex, "max_tracks", 2)
+    monkeypatch.setattr(TrackIndex, "_arrays", None)
+    monkeypatch.setattr(TrackIndex, "_known_ids", None)
+    monkeypatch.setattr(TrackIndex, "_pending", {})
+    monkeypatch.setattr(TrackIndex, "_pending_postings", {})
+
+    TrackIndex.add_tracks(
+        [
+            spotify_item("4u3XiAwJ2U9Kxgy57gcAPB", "Sete", ["BLOND:ISH"], 395040),
+            spotify_item("3plaSBlILmcUoVBAHDca5c", "Toma Dale", ["Classmatic"], 323720),
+        ]
+    )
+    TrackIndex.save()
+    TrackIndex.add_tracks([spotify_item("1rlmw9jPyDnYv9lnYKI1IO", "Dale", ["S-file"], 1)])
+    TrackIndex.save()
+
+    assert TrackIndex.candidates("Sete") == []
+    assert [c["id"] for c in TrackIndex.candidates("Dale")] == [
+        "3plaSBlILmcUoVBAHDca5c",
+        "1rlmw9jPyDnYv9lnYKI1IO",
+    ]
+    assert TrackIndex.candidates("Toma Dale") == [
+        spotify_item("3plaSBlILmcUoVBAHDca5c", "Toma Dale", ["Classmatic"], 323720)
+    ]
+
+
+def test_local_match_skips_edits(
+    monkeypatch: pytest.MonkeyPatch, tmp_path: Path, spotify_item: Callable[..., dict]
+) -> None:
+    """An indexed radio edit is not matched locally to the extended version."""
+    monkeypatch.setattr(track_index, "TRACK_INDEX_PATH", str(tmp_path / "index"))
+    monkeypatch.setattr(TrackIndex, "_arrays", None)
+    monkeypatch.setattr(TrackIndex, "_known_ids", None)
+    monkeypatch.setattr(TrackIndex, "_pending", {})
+    monkeypatch.setattr(TrackIndex, "_pending_postings", {})
+    track = BeatportTrack(
+        name="Mumble",
+        mix="Extended Mix",
+        artists=["Kormak"],
+        remixers=[],
+        release="Mumble",
+        label="Armada",
+        duration="6:40",
+        duration_ms=400000,
+    )
+
+    TrackIndex.add_tracks(
+        [spotify_item("radio", "Mumble - Radio Edit", ["Kormak"], 180000)]
+    )
+    assert search_for_track_local(track, silent=True) is None
+
+    TrackIndex.add_tracks([spotify_item("extended", "Mumble", ["Kormak"], 400500)])
+    assert search_for_track_local(track, silent=True) == "extended"
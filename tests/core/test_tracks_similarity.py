@@ -0,0 +1,139 @@
+"""Test batched track scoring."""
+
+from difflib import SequenceMatcher
+
+import pytest
+
+from src import spotify_utils
+from src.models import BeatportTrack
+from src.spotify_utils import (
+    DURATION_MISMATCH_PENALTY,
+    _char_masks,
+    duration_window,
+    find_exact_match,
+    lcs_ratio,
+    parse_search_results_spotify,
+    score_tracks,
+)
+
+track_search = BeatportTrack(
+    name="Mumble",
+    mix="Extended Mix",
+    artists=["Kormak"],
+    remixers=[],
+    release="Mumble (Extended Mix)",
+    label="REALM Records",
+    duration="6:37",
+    duration_ms=397500,
+)
+
+
+@pytest.mark.parametrize(
+    ("text", "other"),
+    [
+        ("Mumble - Extended Mix", "Mumble - Extended Mix"),
+        ("Mumble - Extended Mix", "Mumble"),
+        ("blond:ish", "BLOND:ISH"),
+        ("", ""),
+        ("Kormak", ""),
+    ],
+)
+def test_lcs_ratio_matches_sequence_matcher(text: str, other: str) -> None:
+    """The LCS ratio is on the same scale as SequenceMatcher.
+
+    It can be higher when SequenceMatcher misses common characters around its
+    longest matching blocks.
+    """
+    assert lcs_ratio(_char_masks(text), len(text), other) == pytest.approx(
+        SequenceMatcher(None, text, other).ratio()
+    )
+
+
+def test_score_tracks_argmax() -> None:
+    """The best candidate is the one with the same artist and name."""
+    found_tracks = [
+        {"name": "Mumble", "artists": [{"name": "Kormak"}]},
+        {"name": "Mumble - Extended Mix", "artists": [{"name": "Someone"}]},
+        {"name": "Mumble - Extended Mix", "artists": [{"name": "Kormak"}]},
+    ]
+
+    scores, best_index = score_tracks(track_search, found_tracks)
+
+    assert best_index == 2
+    assert scores[2] == 1
+    assert score_tracks(track_search, [])[1] == -1
+
+
+def test_duration_window() -> None:
+    """Durations match within the tolerance, edits by their share of the duration."""
+    found_tracks = [
+        {"name": "Mumble - Extended Mix", "duration_ms": 397500 + 500},
+        {"name": "Mumble - Extended Mix", "duration_ms": 397500 + 60000},
+        {"name": "Mumble - Radio Edit", "duration_ms": 397500 // 2},
+        {"name": "Mumble", "duration_ms": 397500 // 2},
+        {"name": "Mumble"},
+    ]
+
+    in_window = duration_window(track_search.duration_ms, found_tracks)
+
+    assert in_window.tolist() == [True, False, True, False, True]
+
+
+def test_score_tracks_duration_penalty() -> None:
+    """Tracks with another duration are penalized, and skipped if they can not win."""
+    same_track = {"name": "Mumble - Extended Mix", "artists": [{"name": "Kormak"}]}
+    found_tracks = [
+        {**same_track, "duration_ms": 397500 + 60000},
+        {**same_track, "duration_ms": 397500},
+    ]
+
+    scores, best_index = score_tracks(track_search, found_tracks)
+    assert best_index == 1
+    assert scores.tolist() == [0, 1]
+
+    scores, best_index = score_tracks(track_search, found_tracks[:1])
+    assert best_index == 0
+    assert scores[0] == DURATION_MISMATCH_PENALTY
+
+    scores, _ = score_tracks(track_search, found_tracks, skip_mismatched_durations=False)
+    assert scores.tolist() == [DURATION_MISMATCH_PENALTY, 1]
+
+
+def test_exact_match_skips_scoring(monkeypatch: pytest.MonkeyPatch) -> None:
+    """An exact name, artist and duration match is accepted without scoring."""
+    found_tracks = [
+        {"id": "other", "name": "Mumble", "artists": [{"name": "Kormak"}]},
+        {
+            "id": "exact",
+            "name": "MUMBLE - Extended Mix",
+            "artists": [{"name": "Someone"}, {"name": "kormak"}],
+            "duration_ms": 397500 + 500,
+        },
+    ]
+    assert find_exact_match(track_search, found_tracks) == 1
+    assert find_exact_match(track_search, found_tracks, source_name="Mumble") == -1
+
+    def fail(*args: object, **kwargs: object) -> None:
+        raise AssertionError("No scoring nor track detail request expected")
+
+    monkeypatch.setattr(spotify_utils, "score_tracks", fail)
+    monkeypatch.setattr(spotify_utils, "get_track_detail", fail)
+    for items in [found_tracks, found_tracks[1:]]:
+        search_results = {"tracks": {"items": items}}
+        track_id = parse_search_results_spotify(
+            search_results, track_search, silent=False
+        )
+        assert track_id == "exact"
+
+
+def test_score_tracks_ties_to_closest_duration() -> None:
+    """Of two tracks scoring the same, the one with the closest duration wins."""
+    same_track = {"name": "Mumble - Extended Mix", "artists": [{"name": "Kormak"}]}
+    found_tracks = [
+        {**same_track, "duration_ms": 397500 + 1500},
+        {**same_track, "duration_ms": 397500 - 100},
+    ]
+
+    scores, best_index = score_tracks(track_search, found_tracks)
+    assert scores.tolist() == [1, 1]
+    assert best_index == 1